@@ -0,0 +1,78 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+def dhash(image: Image.Image, hash_size: int = 16) -> int:
+    """Difference hash: sign of horizontal gradients on a grayscale thumbnail (hash_size² bits)"""
+    gray = image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class ChartAnalysisCache:
+    """Recent chart analyses indexed by perceptual hash; near-duplicate charts reuse them"""
+    
+    def __init__(self, hash_size: int = 16, max_distance: int = 10, max_entries: int = 256,
+                 ttl: float = 21600, enabled: bool = True):
+        # 256-bit hashes: re-encoded / resized screenshots land within ~10 bits, distinct charts 70+ apart
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        
+        self._entries: 'OrderedDict[int, Tuple[float, str]]' = OrderedDict()   # hash -> (stored_at, analysis)
+        self.stats = {'lookups': 0, 'hits': 0, 'exact_hits': 0, 'stored': 0}
+    
+    def hash_image(self, image: Image.Image) -> int:
+        """Perceptual hash of a chart (CPU-bound: call from a worker thread)"""
+        return dhash(image, self.hash_size)
+    
+    def lookup(self, image_hash: int) -> Optional[str]:
+        """Analysis of the nearest recent chart within max_distance, if any"""
+        if not self.enabled:
+            return None
+        self.stats['lookups'] += 1
+        self._expire()
+        
+        best_hash, best_distance = None, self.max_distance + 1
+        for stored_hash in self._entries:
+            distance = hamming_distance(image_hash, stored_hash)
+            if distance < best_distance:
+                best_hash, best_distance = stored_hash, distance
+                if distance == 0:
+                    break
+        if best_hash is None:
+            return None
+        
+        self._entries.move_to_end(best_hash)
+        self.stats['hits'] += 1
+        if best_distance == 0:
+            self.stats['exact_hits'] += 1
+        return self._entries[best_hash][1]
+    
+    def store(self, image_hash: int, analysis: str):
+        if not self.enabled:
+            return
+        self._entries[image_hash] = (time.monotonic(), analysis)
+        self._entries.move_to_end(image_hash)
+        self.stats['stored'] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for stored_hash in [h for h, (stored_at, _) in self._entries.items() if stored_at < cutoff]:
+            del self._entries[stored_hash]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, entries=len(self._entries))
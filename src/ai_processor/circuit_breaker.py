@@ -0,0 +1,138 @@
+import asyncio
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+
+# Breaker states
+CLOSED = 'closed'        # requests flow normally
+OPEN = 'open'            # requests are rejected without calling the backend
+HALF_OPEN = 'half_open'  # a few probe requests decide whether to close again
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend the breaker considers down"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker: stop calling a failing backend, probe it after a cool-down"""
+    
+    def __init__(self, name: str = "backend", failure_threshold: int = 5, cool_down: float = 30,
+                 max_cool_down: float = 300, half_open_probes: int = 1, success_threshold: int = 1,
+                 is_failure: Optional[Callable[[Exception], bool]] = None, enabled: bool = True):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.max_cool_down = max_cool_down
+        self.half_open_probes = half_open_probes
+        self.success_threshold = success_threshold
+        # Errors that say nothing about backend health (bad request, blocked prompt) don't count
+        self.is_failure = is_failure or (lambda error: True)
+        self.enabled = enabled
+        
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._current_cool_down = cool_down
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        
+        self.stats = {'opened': 0, 'rejected': 0, 'failures': 0, 'probes': 0}
+    
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() >= self._open_until:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            logger.info(f"🔌 {self.name} circuit half-open - probing")
+        return self._state
+    
+    def allow_request(self) -> bool:
+        """Whether a request may go to the backend now (reserves a probe slot when half-open)"""
+        if not self.enabled:
+            return True
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+            self._probes_in_flight += 1
+            self.stats['probes'] += 1
+            return True
+        self.stats['rejected'] += 1
+        return False
+    
+    async def call(self, request: Callable[[], Awaitable[Any]]):
+        """Run request() through the breaker; raises CircuitOpenError while open"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit open, retry in {self.retry_in():.0f}s")
+        try:
+            result = await request()
+        except asyncio.CancelledError:
+            self._release_probe()
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure(e)
+            else:
+                # Neutral: the backend answered, but not with a usable response
+                self._release_probe()
+            raise
+        self.record_success()
+        return result
+    
+    def record_success(self):
+        if not self.enabled:
+            return
+        self._consecutive_failures = 0
+        if self._state == HALF_OPEN:
+            self._release_probe()
+            self._probe_successes += 1
+            if self._probe_successes >= self.success_threshold:
+                self._state = CLOSED
+                self._current_cool_down = self.cool_down
+                logger.info(f"✅ {self.name} circuit closed - backend recovered")
+    
+    def record_failure(self, error: Optional[Exception] = None):
+        if not self.enabled:
+            return
+        self.stats['failures'] += 1
+        if self._state == HALF_OPEN:
+            # Probe failed: back off longer before the next one
+            self._release_probe()
+            self._current_cool_down = min(self._current_cool_down * 2, self.max_cool_down)
+            self.trip(error)
+            return
+        self._consecutive_failures += 1
+        if self._state == CLOSED and self._consecutive_failures >= self.failure_threshold:
+            self.trip(error)
+    
+    def trip(self, error: Optional[Exception] = None):
+        """Open the circuit for the current cool-down"""
+        if not self.enabled:
+            return
+        self._state = OPEN
+        self._open_until = time.monotonic() + self._current_cool_down
+        self._consecutive_failures = 0
+        self.stats['opened'] += 1
+        reason = f": {str(error)[:80]}" if error is not None else ""
+        logger.warning(f"🔌 {self.name} circuit OPEN for {self._current_cool_down:.0f}s{reason}")
+    
+    def _release_probe(self):
+        if self._state == HALF_OPEN and self._probes_in_flight > 0:
+            self._probes_in_flight -= 1
+    
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 unless open)"""
+        return max(self._open_until - time.monotonic(), 0.0) if self._state == OPEN else 0.0
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, state=self.state, retry_in=round(self.retry_in(), 1),
+                    consecutive_failures=self._consecutive_failures)
@@ -1,8 +1,13 @@
 import google.generativeai as genai
 import asyncio
+import hashlib
+import io
+import json
 import time
 import re
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable
 import os
 from PIL import Image
 import sys
@@ -14,13 +19,101 @@ sys.path.insert(0, project_root)
 
 from src.utils.config import config
 from src.utils.logger import logger
+from src.utils.trading_signal_praser import TradingSignalParser, TradingSignal
+from src.ai_processor.signal_renderer import SignalRenderer
+from src.ai_processor.rate_limiter import GeminiRateLimiter, estimate_tokens, is_rate_limit_error
+from src.ai_processor.response_cache import ResponseCache, CachedResponse, make_cache_key
+from src.ai_processor.chart_hash_cache import ChartAnalysisCache
+from src.ai_processor.image_preprocessor import ImagePreprocessor
+from src.ai_processor.structured_signal import (SIGNAL_JSON_EXAMPLE, parse_signal_reply, extract_json_object,
+                                                merge_signals, signal_from_json)
+from src.ai_processor.micro_batcher import MicroBatcher
+from src.ai_processor.model_router import ModelRouter, is_failover_error
+from src.ai_processor.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN
+from src.scrapers.duplicate_filter import file_digest
+
+# Older google-generativeai releases have no JSON response mode; the prompt alone asks for JSON there
+JSON_MODE_SUPPORTED = 'response_mime_type' in getattr(genai.types.GenerationConfig, '__annotations__', {})
 
 class ForexGeminiProcessor:
     def __init__(self):
         self.config = config.get_gemini_config()
         self.message_format_template = config.get('message_format.template', '')
         self.max_tokens = self.config.get('max_tokens', 400)  # Reduced for trading
-        self.rate_limit_delay = config.get('system.rate_limit_delay', 5)  # Increased delay
+        self.max_retries = config.get('system.max_retries', 3)
+        
+        # One limiter shared by the text and vision models
+        rate_limit = self.config.get('rate_limit', {})
+        self.rate_limiter = GeminiRateLimiter(
+            requests_per_minute=rate_limit.get('requests_per_minute', 15),
+            tokens_per_minute=rate_limit.get('tokens_per_minute', 1000000),
+            max_backoff=rate_limit.get('max_backoff', 60)
+        )
+        self.max_retry_wait = rate_limit.get('max_retry_wait', 20)
+        
+        # Repeated prompts / charts are answered from cache without spending quota
+        cache_config = self.config.get('cache', {}) or {}
+        self.response_cache = ResponseCache(
+            path=cache_config.get('path', 'data/gemini_cache.db'),
+            ttl=cache_config.get('ttl_seconds', 86400),
+            max_entries=cache_config.get('max_entries', 512),
+            max_disk_entries=cache_config.get('max_disk_entries', 5000),
+            enabled=cache_config.get('enabled', True)
+        )
+        
+        # Re-posted / re-encoded charts reuse the analysis of a perceptually identical image
+        chart_cache_config = self.config.get('chart_cache', {}) or {}
+        self.chart_cache = ChartAnalysisCache(
+            hash_size=chart_cache_config.get('hash_size', 16),
+            max_distance=chart_cache_config.get('max_distance', 10),
+            max_entries=chart_cache_config.get('max_entries', 256),
+            ttl=chart_cache_config.get('ttl_seconds', 21600),
+            enabled=chart_cache_config.get('enabled', True)
+        )
+        
+        # Charts are downsized / re-encoded in a process pool before upload
+        self.image_preprocessor = ImagePreprocessor(self.config.get('image_preprocessing', {}) or {})
+        
+        # Parser-first fast path: well-formed signals are rendered locally without Gemini
+        self.local_render_enabled = config.get('message_format.local_render.enabled', True)
+        self.local_render_min_confidence = config.get('message_format.local_render.min_confidence', 0.8)
+        self.signal_parser = TradingSignalParser(config.get('forex_filters', {}))
+        self.signal_renderer = SignalRenderer(self.message_format_template,
+                                              config.get('message_format.max_length', 400))
+        self.stats = {'local_rendered': 0, 'ai_processed': 0}
+        
+        # Structured mode: the model returns the setup as JSON and the template is rendered locally
+        structured_config = self.config.get('structured_output', {}) or {}
+        self.structured_charts = structured_config.get('charts', True)
+        self.structured_text = structured_config.get('text', True)
+        self.structured_max_tokens = structured_config.get('max_tokens', 300)
+        
+        # Opt-in: concurrent text messages share one multi-item JSON request during bursts
+        batching_config = self.config.get('batching', {}) or {}
+        self.text_batcher = None
+        if batching_config.get('enabled', False) and self.structured_text:
+            self.text_batcher = MicroBatcher(self._analyze_text_batch,
+                                             max_items=batching_config.get('max_items', 4),
+                                             max_wait=batching_config.get('max_wait_ms', 250) / 1000)
+        
+        # Outages / quota exhaustion: skip Gemini for a cool-down instead of failing every message
+        breaker_config = self.config.get('circuit_breaker', {}) or {}
+        self.circuit_breaker = CircuitBreaker(
+            name="Gemini",
+            failure_threshold=breaker_config.get('failure_threshold', 5),
+            cool_down=breaker_config.get('cool_down', 30),
+            max_cool_down=breaker_config.get('max_cool_down', 300),
+            half_open_probes=breaker_config.get('half_open_probes', 1),
+            success_threshold=breaker_config.get('success_threshold', 1),
+            is_failure=is_failover_error,
+            enabled=breaker_config.get('enabled', True)
+        )
+        
+        # Gemini calls must never block the event loop (Telethon updates, notifier tasks)
+        self.request_timeout = self.config.get('request_timeout', 30)
+        self.use_async_client = self.config.get('async_client', True)
+        self._executor = ThreadPoolExecutor(max_workers=self.config.get('max_workers', 4),
+                                            thread_name_prefix='gemini')
         
         # Check if we're in test mode or API key missing
         self.test_mode = config.is_test_mode()
@@ -39,8 +132,13 @@ class ForexGeminiProcessor:
             
             # Use Flash model by default (most reliable and lowest quota)
             model_name = self.config.get('model', 'gemini-1.5-flash')
-            self.text_model = genai.GenerativeModel(model_name)
-            self.vision_model = genai.GenerativeModel(self.config.get('vision_model', 'gemini-1.5-flash'))
+            vision_model_name = self.config.get('vision_model', 'gemini-1.5-flash')
+            
+            # Ordered model lists (first preferred): slow / failing models are hedged or failed over
+            routing_config = self.config.get('routing', {}) or {}
+            self.text_model = self._build_model(routing_config.get('text_models') or [model_name], routing_config)
+            self.vision_model = self._build_model(routing_config.get('vision_models') or [vision_model_name],
+                                                  routing_config)
             
             logger.info(f"🤖 Forex Gemini AI processor initialized with {model_name}")
         except Exception as e:
@@ -48,25 +146,62 @@ class ForexGeminiProcessor:
             logger.warning("⚠️ Switching to fallback mode for forex analysis")
             self.fallback_mode = True
     
+    def _build_model(self, model_names: List[str], routing_config: Dict[str, Any]):
+        """GenerativeModel, or a ModelRouter over several when routing is enabled"""
+        models = [genai.GenerativeModel(name) for name in model_names]
+        if not routing_config.get('enabled', False):
+            return models[0]
+        return ModelRouter(
+            models,
+            call=self._start_generate,
+            hedge=routing_config.get('hedge', True),
+            hedge_delay=routing_config.get('hedge_delay_ms', 4000) / 1000,
+            min_hedge_delay=routing_config.get('min_hedge_delay_ms', 1500) / 1000,
+            error_threshold=routing_config.get('error_threshold', 0.5),
+            window_seconds=routing_config.get('window_seconds', 300),
+            reserve=self._reserve_request
+        )
+    
     async def process_text_message(self, message_data: Dict[str, Any]) -> str:
         """Process text message for forex trading signals"""
+        start_time = time.time()
+        
+        signal = self._get_confident_signal(message_data)
+        if signal is not None:
+            formatted_message = self.signal_renderer.render(signal, message_data)
+            self.stats['local_rendered'] += 1
+            logger.log_ai_processing("forex-text-local", time.time() - start_time)
+            return formatted_message
+        
         if self.fallback_mode:
             return self._create_fallback_forex_message(message_data)
         
-        start_time = time.time()
-        
         try:
+            self.stats['ai_processed'] += 1
+            
+            # JSON fields merged with the parser result, notification rendered locally
+            if self.structured_text:
+                formatted_message = await self._process_text_structured(message_data)
+                if formatted_message is not None:
+                    logger.log_ai_processing("forex-text-json", time.time() - start_time)
+                    return formatted_message
+                return self._create_fallback_forex_message(message_data)
+            
             # Create forex-specific prompt
             prompt = self._create_forex_analysis_prompt(message_data)
             
-            # Generate response
-            response = await self._generate_response(self.text_model, prompt)
+            # Generate response; the answer depends on the message text, not on who posted it when
+            response = await self._generate_response(self.text_model, prompt,
+                                                     cache_parts=('forex-text', message_data['text']))
             
             processing_time = time.time() - start_time
             logger.log_ai_processing("forex-text", processing_time)
             
             return response
             
+        except CircuitOpenError:
+            logger.debug("🔌 Gemini circuit open, using fallback formatting")
+            return self._create_fallback_forex_message(message_data)
         except Exception as e:
             if "429" in str(e) or "quota" in str(e).lower():
                 logger.warning("⏳ Rate limited, using fallback formatting")
@@ -74,6 +209,119 @@ class ForexGeminiProcessor:
                 logger.error(f"❌ Error processing forex text message: {e}")
             return self._create_fallback_forex_message(message_data)
     
+    async def _process_text_structured(self, message_data: Dict[str, Any]) -> Optional[str]:
+        """Text → JSON fields → merged with the local parse → locally rendered notification (None if unreadable)"""
+        data = await self._text_signal_json(message_data['text'])
+        if data is None:
+            return None
+        remote, notes = signal_from_json(data, self.signal_parser)
+        
+        local = message_data.get('trading_signal') or self.signal_parser.extract_trading_signal(message_data['text'])
+        signal = self._apply_signal(message_data, merge_signals(local, remote))
+        message_data['text_analysis'] = json.dumps(dict(signal.to_dict(), notes=notes))
+        return self._render_signal(signal, message_data, notes)
+    
+    async def _text_signal_json(self, text: str) -> Optional[Dict[str, Any]]:
+        """JSON setup for one message: cache, then the micro-batch, then a request of its own"""
+        generation_config = self._structured_generation_config()
+        key = make_cache_key(self.text_model, generation_config, 'forex-text-json', text)
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            return extract_json_object(cached)
+        
+        # Half-open probes go out one message at a time
+        batching = self.text_batcher is not None and self.circuit_breaker.state == CLOSED
+        data = await self.text_batcher.submit(text) if batching else None
+        if data is None:
+            # Not batching, or the batch reply left this message out
+            response = await self._request_with_retries(self.text_model, self._text_json_prompt(text),
+                                                        generation_config)
+            reply = response.text.strip()
+            data = extract_json_object(reply)
+            if data is None:
+                logger.warning(f"⚠️ Text analysis was not valid JSON: {reply[:100]}")
+                return None
+        
+        # Cached per message, so a batched answer also serves later repeats of the same text
+        await self.response_cache.set(key, json.dumps(data))
+        return data
+    
+    def _text_json_prompt(self, text: str) -> str:
+        return f"""
+        Extract the trade setup from this forex/trading message.
+        
+        MESSAGE: {text}
+        
+        Reply with ONLY a JSON object with these keys (null when the message doesn't state it, numbers without thousands separators):
+        {SIGNAL_JSON_EXAMPLE}
+        
+        "take_profit" is a list of all targets; "notes" is at most one short sentence on the reasoning or market context.
+        Use the EXACT numbers from the message, never estimate levels.
+        """
+    
+    async def _analyze_text_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """One request for several messages; results in input order, None where the reply has no entry"""
+        messages = "\n\n".join(f"MESSAGE {number}:\n{text}" for number, text in enumerate(texts, 1))
+        prompt = f"""
+        Extract the trade setup from each of these {len(texts)} forex/trading messages.
+        
+        {messages}
+        
+        Reply with ONLY a JSON object {{"results": [...]}} holding one object per message. Each object has
+        "id" (the message number) plus these keys (null when the message doesn't state it, numbers without thousands separators):
+        {SIGNAL_JSON_EXAMPLE}
+        
+        "take_profit" is a list of all targets; "notes" is at most one short sentence on the reasoning or market context.
+        Use the EXACT numbers from each message, never estimate levels or mix messages up.
+        """
+        response = await self._request_with_retries(self.text_model, prompt,
+                                                    self._structured_generation_config(len(texts)))
+        data = extract_json_object(response.text) or {}
+        
+        results: Dict[int, Dict[str, Any]] = {}
+        for entry in data.get('results') or []:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                results[int(entry.get('id'))] = entry
+            except (TypeError, ValueError):
+                continue
+        logger.debug(f"📦 Batched {len(texts)} text messages, {len(results)} results")
+        return [results.get(number) for number in range(1, len(texts) + 1)]
+    
+    def _apply_signal(self, message_data: Dict[str, Any], signal: TradingSignal) -> TradingSignal:
+        """Record a (merged) signal on the message so storage / notifiers see the final levels"""
+        message_data['trading_signal'] = signal
+        message_data['signal_confidence'] = signal.confidence
+        if signal.is_valid_signal:
+            message_data['is_trading_message'] = True
+        return signal
+    
+    def _get_confident_signal(self, message_data: Dict[str, Any]) -> Optional[TradingSignal]:
+        """Return the parsed signal if it is complete enough to skip Gemini"""
+        if not self.local_render_enabled or not self.message_format_template:
+            return None
+        
+        signal = message_data.get('trading_signal')
+        if signal is None:
+            text = message_data.get('text')
+            if not text:
+                return None
+            signal = self.signal_parser.extract_trading_signal(text)
+        
+        if signal.is_valid_signal and signal.confidence >= self.local_render_min_confidence:
+            return signal
+        return None
+    
+    def render_parser_only(self, message_data: Dict[str, Any]) -> Optional[str]:
+        """Local rendering of any valid parsed signal (used when shedding load)"""
+        signal = message_data.get('trading_signal')
+        if signal is None and message_data.get('text'):
+            signal = self.signal_parser.extract_trading_signal(message_data['text'])
+        if signal is None or not signal.is_valid_signal or not self.message_format_template:
+            return None
+        return self.signal_renderer.render(signal, message_data)
+    
     async def process_image_message(self, message_data: Dict[str, Any]) -> str:
         """Process chart image for forex trading signals using enhanced methodology"""
         if self.fallback_mode:
@@ -82,9 +330,19 @@ class ForexGeminiProcessor:
         start_time = time.time()
         
         try:
-            # Step 1: Analyze the chart image with enhanced methodology
-            if message_data.get('media_path'):
-                chart_analysis = await self._analyze_forex_chart_enhanced(message_data['media_path'])
+            # Step 1: Analyze the chart image with enhanced methodology (in-memory download or stored file)
+            image_source = message_data.get('_media_bytes') or message_data.get('media_path')
+            
+            # One vision call returning JSON replaces the analyze-then-format chain
+            if self.structured_charts and image_source:
+                formatted_message = await self._process_chart_structured(message_data, image_source)
+                if formatted_message is None:
+                    return self._create_fallback_forex_message(message_data, "Chart analysis unreadable")
+                logger.log_ai_processing("forex-chart-json", time.time() - start_time)
+                return formatted_message
+            
+            if image_source:
+                chart_analysis = await self._analyze_forex_chart_enhanced(image_source)
                 
                 # Add analysis to message data
                 message_data['chart_analysis'] = chart_analysis
@@ -101,16 +359,95 @@ class ForexGeminiProcessor:
             
             return formatted_message
             
+        except CircuitOpenError:
+            logger.debug("🔌 Gemini circuit open, chart sent for manual review")
+            return self._create_fallback_forex_message(message_data, "AI analysis paused")
         except Exception as e:
             logger.error(f"❌ Error processing forex chart: {e}")
             return self._create_fallback_forex_message(message_data, "Chart analysis failed")
     
-    async def _analyze_forex_chart_enhanced(self, image_path: str) -> str:
+    async def _process_chart_structured(self, message_data: Dict[str, Any], image_path: Union[str, bytes]) -> Optional[str]:
+        """Chart → JSON setup → validated signal → locally rendered notification (None if unreadable)"""
+        reply = await self._analyze_chart_structured(image_path)
+        parsed = parse_signal_reply(reply, self.signal_parser)
+        if parsed is None:
+            logger.warning(f"⚠️ Chart analysis was not valid JSON: {reply[:100]}")
+            return None
+        remote, notes = parsed
+        
+        # Levels typed in the caption beat levels read off the picture
+        signal = self._apply_signal(message_data, merge_signals(message_data.get('trading_signal'), remote))
+        
+        # Keep the setup as data (stored / reused) rather than prose
+        message_data['chart_analysis'] = json.dumps(dict(signal.to_dict(), notes=notes))
+        message_data['content_type'] = 'forex_chart'
+        return self._render_signal(signal, message_data, notes)
+    
+    async def _analyze_chart_structured(self, image_path: Union[str, bytes]) -> str:
+        """Single vision call returning the trade setup as a strict JSON object"""
+        structured_chart_prompt = f"""
+        You are reading a forex (or commodity) trade setup chart, typically a TradingView screenshot.
+        
+        - Instrument and timeframe are shown at the top of the chart
+        - The risk/reward tool has a blue/green (target) and a red/pink (stop) zone; their boundary is the entry
+        - Blue/green zone ABOVE the entry = BUY, BELOW the entry = SELL
+        - Take profit is the far edge of the blue/green zone, stop loss the far edge of the red/pink zone
+        - Read exact prices from the labels or the right-hand price scale
+        
+        Reply with ONLY a JSON object with these keys (null when not visible, numbers without thousands separators):
+        {SIGNAL_JSON_EXAMPLE}
+        
+        "take_profit" is a list of all target levels; "notes" is at most one short sentence (support, pattern, duration).
+        """
+        
+        analysis = await self._run_chart_analysis(
+            image_path, structured_chart_prompt,
+            generation_config=self._structured_generation_config(),
+            cacheable=lambda reply: extract_json_object(reply) is not None
+        )
+        logger.debug(f"📊 Structured chart analysis: {analysis[:150]}")
+        return analysis
+    
+    def _structured_generation_config(self, items: int = 1):
+        """Low-temperature, short-output settings for JSON replies"""
+        generation_settings = {'max_output_tokens': self.structured_max_tokens * items, 'temperature': 0.1}
+        if JSON_MODE_SUPPORTED:
+            generation_settings['response_mime_type'] = 'application/json'
+        return genai.types.GenerationConfig(**generation_settings)
+    
+    def _render_signal(self, signal: TradingSignal, message_data: Dict[str, Any], notes: Optional[str] = None) -> str:
+        """Notification text for a signal, rendered locally"""
+        if not signal.is_valid_signal:
+            # No tradeable setup: the manual-review layout rather than a template full of N/A
+            return self._create_fallback_forex_message(message_data, notes or "No complete setup found")
+        if self.message_format_template:
+            return self.signal_renderer.render(signal, message_data, analysis=notes)
+        summary = self.signal_parser.format_signal_summary(signal)
+        return f"{summary}\n📝 {notes}" if notes else summary
+    
+    async def _run_chart_analysis(self, image_path: Union[str, bytes], prompt: str, generation_config=None,
+                                  cacheable: Optional[Callable[[str], bool]] = None) -> str:
+        """Vision call on a prepared chart, answered from the chart cache for near-duplicates"""
+        # Load and prepare image off the event loop
+        image, image_hash = await self._prepare_chart(image_path)
+        
+        if image_hash is not None:
+            cached_analysis = self.chart_cache.lookup(image_hash)
+            if cached_analysis is not None:
+                logger.debug("🖼️ Near-duplicate chart - reusing stored analysis")
+                return cached_analysis
+        image_digest = await self._image_digest(image_path)
+        
+        response = await self._call_model(self.vision_model, [prompt, image], generation_config=generation_config,
+                                          cache_parts=(prompt, image_digest))
+        analysis = response.text.strip()
+        if image_hash is not None and (cacheable is None or cacheable(analysis)):
+            self.chart_cache.store(image_hash, analysis)
+        return analysis
+    
+    async def _analyze_forex_chart_enhanced(self, image_path: Union[str, bytes]) -> str:
         """Enhanced forex chart analysis using the proper methodology from PDF instructions"""
         try:
-            # Load and prepare image
-            image = Image.open(image_path)
-            
             # Create the enhanced forex chart analysis prompt based on PDF instructions
             enhanced_chart_prompt = """
             You are analyzing a forex (or commodity) trade signal chart, typically from platforms like TradingView. 
@@ -193,12 +530,13 @@ class ForexGeminiProcessor:
             """
             
             # Generate enhanced chart analysis
-            response = self.vision_model.generate_content([enhanced_chart_prompt, image])
-            analysis = response.text.strip()
+            analysis = await self._run_chart_analysis(image_path, enhanced_chart_prompt)
             
             logger.debug(f"📊 Enhanced chart analyzed: {analysis[:150]}...")
             return analysis
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error analyzing forex chart with enhanced method: {e}")
             return "Unable to analyze chart - manual review required"
@@ -266,15 +604,19 @@ class ForexGeminiProcessor:
         Create the notification now using the structured analysis data.
         """
         
-        response = await self._generate_response(self.text_model, prompt)
+        # Everything in the prompt except the timestamp, which the output doesn't use
+        cache_parts = ('forex-chart-format', chart_analysis, message_data.get('text'),
+                       message_data['source'], message_data['chat_title'], message_data['sender_name'])
+        response = await self._generate_response(self.text_model, prompt, cache_parts=cache_parts)
         return response
     
     # Keep the original _analyze_forex_chart method as backup
-    async def _analyze_forex_chart(self, image_path: str) -> str:
+    async def _analyze_forex_chart(self, image_path: Union[str, bytes]) -> str:
         """Original chart analysis method (kept as backup)"""
         try:
-            # Load and prepare image
-            image = Image.open(image_path)
+            # Load and prepare image off the event loop
+            image, _ = await self._prepare_chart(image_path)
+            image_digest = await self._image_digest(image_path)
             
             # Create detailed forex chart analysis prompt
             chart_prompt = """
@@ -328,7 +670,8 @@ class ForexGeminiProcessor:
             """
             
             # Generate chart analysis
-            response = self.vision_model.generate_content([chart_prompt, image])
+            response = await self._call_model(self.vision_model, [chart_prompt, image],
+                                              cache_parts=(chart_prompt, image_digest))
             analysis = response.text.strip()
             
             logger.debug(f"📊 Chart analyzed: {analysis[:150]}...")
@@ -434,19 +777,18 @@ class ForexGeminiProcessor:
         Keep under 400 characters for mobile notification.
         """
     
-    async def _generate_response(self, model, prompt: str) -> str:
+    async def _generate_response(self, model, prompt: str, cache_parts: Optional[tuple] = None) -> str:
         """Generate response from Gemini with rate limiting"""
         try:
-            # Add rate limiting delay
-            await asyncio.sleep(self.rate_limit_delay)
-            
             # Generate response
-            response = model.generate_content(
+            response = await self._call_model(
+                model,
                 prompt,
                 generation_config=genai.types.GenerationConfig(
                     max_output_tokens=self.max_tokens,
                     temperature=0.3,
-                )
+                ),
+                cache_parts=cache_parts
             )
             
             return response.text.strip()
@@ -455,6 +797,158 @@ class ForexGeminiProcessor:
             logger.error(f"❌ Gemini API error: {e}")
             raise
     
+    async def _call_model(self, model, contents, generation_config=None, timeout: Optional[float] = None,
+                          cache_parts: Optional[tuple] = None):
+        """Cached, rate-limited generate_content; cache_parts replaces contents as the cache key"""
+        key = make_cache_key(model, generation_config, *(cache_parts or (contents,)))
+        cached = await self.response_cache.get(key)
+        if cached is not None:
+            logger.debug("💾 Gemini response served from cache")
+            return CachedResponse(cached)
+        
+        response = await self._request_with_retries(model, contents, generation_config, timeout)
+        try:
+            text = response.text
+        except Exception:
+            # Blocked / empty candidates: let the caller handle it, never cache it
+            return response
+        await self.response_cache.set(key, text)
+        return response
+    
+    async def _request_with_retries(self, model, contents, generation_config=None, timeout: Optional[float] = None):
+        """Gemini request through the circuit breaker (raises CircuitOpenError without calling while open)"""
+        return await self.circuit_breaker.call(
+            partial(self._request_rate_limited, model, contents, generation_config, timeout)
+        )
+    
+    async def _request_rate_limited(self, model, contents, generation_config=None, timeout: Optional[float] = None):
+        """Rate-limited generate_content; retries 429s while the server asks for a short wait"""
+        max_output_tokens = getattr(generation_config, 'max_output_tokens', None) or self.max_tokens
+        estimated = estimate_tokens(contents, max_output_tokens)
+        
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(estimated)
+            try:
+                response = await self._generate_once(model, contents, generation_config, timeout)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                delay = self.rate_limiter.on_rate_limited(e)
+                if attempt >= self.max_retries or delay > self.max_retry_wait:
+                    raise
+                logger.warning(f"⏳ Gemini rate limited, retrying in {delay:.0f}s "
+                               f"(attempt {attempt + 1}/{self.max_retries})")
+                continue
+            
+            usage = getattr(response, 'usage_metadata', None)
+            self.rate_limiter.record_usage(estimated, getattr(usage, 'total_token_count', None))
+            return response
+    
+    async def _generate_once(self, model, contents, generation_config=None, timeout: Optional[float] = None):
+        """Run generate_content without blocking the event loop, with a per-call timeout"""
+        timeout = timeout or self.request_timeout
+        
+        if isinstance(model, ModelRouter):
+            # The timeout bounds the whole hedged / failed-over exchange
+            call = model.generate(contents, generation_config)
+        else:
+            call = self._start_generate(model, contents, generation_config)
+        
+        try:
+            return await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏰ Gemini request timed out after {timeout}s")
+            raise
+    
+    def _start_generate(self, model, contents, generation_config=None):
+        """Awaitable for one generate_content call on a single model"""
+        if self.use_async_client and hasattr(model, 'generate_content_async'):
+            return model.generate_content_async(contents, generation_config=generation_config)
+        # Bounded pool: a timed-out call keeps its thread until the SDK returns,
+        # so max_workers also caps how many abandoned requests can pile up
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self._executor, partial(model.generate_content, contents, generation_config=generation_config)
+        )
+    
+    async def _reserve_request(self, contents, generation_config=None):
+        """Rate limiter budget for a hedged / failed-over duplicate request"""
+        max_output_tokens = getattr(generation_config, 'max_output_tokens', None) or self.max_tokens
+        await self.rate_limiter.acquire(estimate_tokens(contents, max_output_tokens))
+    
+    async def _load_image(self, image_path: Union[str, bytes]) -> Image.Image:
+        """Decode a chart image (file path or bytes) in the worker pool"""
+        def load():
+            image = Image.open(io.BytesIO(image_path) if isinstance(image_path, bytes) else image_path)
+            image.load()
+            return image
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, load)
+    
+    async def _prepare_chart(self, image_path: Union[str, bytes]) -> Tuple[Any, Optional[int]]:
+        """Vision-ready image part and its perceptual hash (None when the chart cache is off)"""
+        hash_size = self.chart_cache.hash_size if self.chart_cache.enabled else None
+        
+        if self.image_preprocessor.enabled:
+            try:
+                prepared = await self.image_preprocessor.prepare(image_path, hash_size)
+                logger.debug(f"🗜️ Chart preprocessed: {prepared.original_bytes // 1024}KB → "
+                             f"{len(prepared.data) // 1024}KB {prepared.width}x{prepared.height} "
+                             f"(decode {prepared.decode_seconds * 1000:.0f}ms)")
+                return prepared.as_part(), prepared.image_hash
+            except Exception as e:
+                logger.warning(f"⚠️ Chart preprocessing failed, sending original image: {e}")
+        
+        image = await self._load_image(image_path)
+        image_hash = None
+        if hash_size:
+            loop = asyncio.get_running_loop()
+            image_hash = await loop.run_in_executor(self._executor, self.chart_cache.hash_image, image)
+        return image, image_hash
+    
+    async def _image_digest(self, image_path: Union[str, bytes]) -> Optional[str]:
+        """Content hash of a chart file or in-memory image (response cache key)"""
+        loop = asyncio.get_running_loop()
+        if isinstance(image_path, bytes):
+            return await loop.run_in_executor(self._executor, lambda: hashlib.sha256(image_path).hexdigest())
+        return await loop.run_in_executor(self._executor, file_digest, image_path)
+    
+    def close(self):
+        """Release the Gemini worker pool, the preprocessing pool and the response cache"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.text_batcher is not None:
+            self.text_batcher.close()
+        self.image_preprocessor.close()
+        self.response_cache.close()
+    
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Per-model latency / error stats of routed models (empty when routing is off)"""
+        models = {'text': getattr(self, 'text_model', None), 'vision': getattr(self, 'vision_model', None)}
+        return {kind: model.snapshot() for kind, model in models.items() if isinstance(model, ModelRouter)}
+    
+    def get_circuit_stats(self) -> Dict[str, Any]:
+        return self.circuit_breaker.snapshot()
+    
+    def get_batching_stats(self) -> Optional[Dict[str, Any]]:
+        return self.text_batcher.snapshot() if self.text_batcher is not None else None
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Current Gemini request / token budget and backoff state"""
+        return self.rate_limiter.snapshot()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache hit/miss counters"""
+        return self.response_cache.snapshot()
+    
+    def get_chart_cache_stats(self) -> Dict[str, Any]:
+        """Perceptual chart cache counters"""
+        return self.chart_cache.snapshot()
+    
+    def get_preprocessing_stats(self) -> Dict[str, Any]:
+        """Chart preprocessing bytes saved and decode time"""
+        return self.image_preprocessor.snapshot()
+    
     def _create_fallback_forex_message(self, message_data: Dict[str, Any], error_note: str = "") -> str:
         """Create fallback forex message when AI processing fails with enhanced chart context"""
         timestamp = message_data['timestamp'].strftime("%H:%M")
@@ -512,13 +1006,12 @@ class ForexGeminiProcessor:
             logger.info("✅ Forex processor running in FALLBACK mode (no API needed)")
             return True
         
-        # Only test the model we're actually using
+        # Only test the model we're actually using (live call, never answered from the cache)
+        model_name = self.config.get('model', 'gemini-1.5-flash')
         try:
-            model_name = self.config.get('model', 'gemini-1.5-flash')
-            test_model = genai.GenerativeModel(model_name)
-            
             test_prompt = "Say 'FOREX READY' if you can analyze trading signals."
-            response = test_model.generate_content(
+            response = await self._request_with_retries(
+                self.text_model,
                 test_prompt,
                 generation_config=genai.types.GenerationConfig(
                     max_output_tokens=20,  # Very small for testing
@@ -528,22 +1021,31 @@ class ForexGeminiProcessor:
             
             if "forex" in response.text.lower() and "ready" in response.text.lower():
                 logger.info(f"✅ Forex Gemini API test successful with {model_name}")
-                return True
             else:
-                logger.warning(f"⚠️ Unexpected response from {model_name}, switching to fallback")
-                self.fallback_mode = True
-                return True  # Still return True to continue with fallback
+                # The API answered, so analysis can still run
+                logger.warning(f"⚠️ Unexpected response from {model_name}, continuing with AI analysis")
+            return True
             
+        except CircuitOpenError:
+            logger.warning("🔌 Gemini circuit already open - fallback formatting until it recovers")
+            return True
         except Exception as e:
             error_msg = str(e)
+            if not self.circuit_breaker.is_failure(e):
+                # Request-level error (bad request, blocked prompt): the backend itself is reachable
+                logger.warning(f"⚠️ Gemini test request rejected: {error_msg[:100]}... - continuing with AI analysis")
+                return True
+            
             if "429" in error_msg or "quota" in error_msg.lower():
-                logger.warning("⏳ Gemini API quota exceeded - switching to fallback mode")
+                logger.warning("⏳ Gemini API quota exceeded - fallback formatting until the circuit recovers")
             elif "404" in error_msg or "not found" in error_msg.lower():
-                logger.warning("⚠️ Gemini model not available - switching to fallback mode")
+                logger.warning("⚠️ Gemini model not available - fallback formatting until the circuit recovers")
             else:
-                logger.warning(f"⚠️ Gemini API error: {error_msg[:100]}... - switching to fallback mode")
+                logger.warning(f"⚠️ Gemini API error: {error_msg[:100]}... - fallback formatting until the circuit recovers")
             
-            self.fallback_mode = True
+            # Not permanent: the breaker probes again after its cool-down and resumes AI on success
+            if self.circuit_breaker.state != OPEN:
+                self.circuit_breaker.trip(e)
             return True  # Always return True to continue with fallback
 
 # Test function
@@ -0,0 +1,141 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Sequence, Union
+
+from PIL import Image, ImageOps
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.ai_processor.chart_hash_cache import dhash
+
+FORMATS = {'jpeg': ('JPEG', 'image/jpeg'), 'webp': ('WEBP', 'image/webp')}
+SOURCE_PASSTHROUGH = ('image/jpeg', 'image/png', 'image/webp')
+
+
+@dataclass
+class PreparedImage:
+    """Re-encoded chart ready for the vision model"""
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    original_bytes: int
+    image_hash: Optional[int]
+    decode_seconds: float
+    total_seconds: float
+    
+    def as_part(self) -> Dict[str, Any]:
+        """Inline blob accepted by generate_content"""
+        return {'mime_type': self.mime_type, 'data': self.data}
+
+
+def prepare_chart(path: Union[str, bytes], max_dimension: int = 1024, crop: Optional[Sequence[float]] = None,
+                  image_format: str = 'jpeg', quality: int = 85, hash_size: Optional[int] = None) -> PreparedImage:
+    """EXIF-normalize, crop, downsize and re-encode a chart file or in-memory image (runs in a worker process)"""
+    started = time.perf_counter()
+    in_memory = isinstance(path, bytes)
+    original_bytes = len(path) if in_memory else os.path.getsize(path)
+    with Image.open(io.BytesIO(path) if in_memory else path) as source:
+        source.load()
+        decode_seconds = time.perf_counter() - started
+        source_mime = Image.MIME.get(source.format)
+        image = ImageOps.exif_transpose(source).convert('RGB')
+    original_size = image.size
+    
+    # Hash the full chart so it matches analyses cached before cropping/resizing settings changed
+    image_hash = dhash(image, hash_size) if hash_size else None
+    
+    if crop:
+        # Fractions of width/height: (left, top, right, bottom)
+        left, top, right, bottom = crop
+        image = image.crop((int(left * image.width), int(top * image.height),
+                            int(right * image.width), int(bottom * image.height)))
+    if max_dimension and max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    
+    pil_format, mime_type = FORMATS.get(image_format.lower(), FORMATS['jpeg'])
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, quality=quality, optimize=pil_format == 'JPEG')
+    data = buffer.getvalue()
+    
+    # Already small and untouched: re-encoding would only cost quality
+    if image.size == original_size and len(data) >= original_bytes and source_mime in SOURCE_PASSTHROUGH:
+        if in_memory:
+            data, mime_type = path, source_mime
+        else:
+            with open(path, 'rb') as file:
+                data, mime_type = file.read(), source_mime
+    return PreparedImage(data, mime_type, image.width, image.height, original_bytes,
+                         image_hash, decode_seconds, time.perf_counter() - started)
+
+
+class ImagePreprocessor:
+    """Runs chart preprocessing in a process pool so Pillow work never stalls the event loop"""
+    
+    def __init__(self, settings: Dict[str, Any]):
+        self.enabled = settings.get('enabled', True)
+        self.max_dimension = settings.get('max_dimension', 1024)
+        self.crop = settings.get('crop') or None
+        self.image_format = settings.get('format', 'jpeg')
+        self.quality = settings.get('quality', 85)
+        self.workers = settings.get('workers', 2)
+        # spawn: forking a process that runs Telethon/executor threads can copy held locks
+        self.start_method = settings.get('start_method', 'spawn')
+        
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {'images': 0, 'original_bytes': 0, 'processed_bytes': 0,
+                      'decode_seconds': 0.0, 'total_seconds': 0.0, 'failures': 0}
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context(self.start_method))
+        return self._pool
+    
+    async def prepare(self, path: Union[str, bytes], hash_size: Optional[int] = None) -> PreparedImage:
+        """Preprocess one chart in the pool; raises if the image can't be processed"""
+        loop = asyncio.get_running_loop()
+        try:
+            prepared = await loop.run_in_executor(
+                self._get_pool(), prepare_chart, path, self.max_dimension, self.crop,
+                self.image_format, self.quality, hash_size
+            )
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; start a fresh one next time
+            self._pool = None
+            self.stats['failures'] += 1
+            raise
+        except Exception:
+            self.stats['failures'] += 1
+            raise
+        
+        self.stats['images'] += 1
+        self.stats['original_bytes'] += prepared.original_bytes
+        self.stats['processed_bytes'] += len(prepared.data)
+        self.stats['decode_seconds'] += prepared.decode_seconds
+        self.stats['total_seconds'] += prepared.total_seconds
+        return prepared
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        images = self.stats['images']
+        return dict(
+            self.stats,
+            bytes_saved=self.stats['original_bytes'] - self.stats['processed_bytes'],
+            decode_ms_avg=round(self.stats['decode_seconds'] / images * 1000, 1) if images else 0.0,
+            total_ms_avg=round(self.stats['total_seconds'] / images * 1000, 1) if images else 0.0
+        )
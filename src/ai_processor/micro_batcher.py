@@ -0,0 +1,92 @@
+import asyncio
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+
+
+class MicroBatcher:
+    """Collects items for up to max_wait seconds (or max_items) and hands them to one batch call"""
+    
+    def __init__(self, handler: Callable[[List[Any]], Awaitable[List[Optional[Any]]]],
+                 max_items: int = 4, max_wait: float = 0.25, min_items: int = 2):
+        # handler returns one result per item (same order); None marks an item the batch missed
+        self.handler = handler
+        self.max_items = max(max_items, 1)
+        self.max_wait = max_wait
+        # Fewer items than this are returned as None straight away: the caller's single request is cheaper
+        self.min_items = min_items
+        
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        
+        self.stats = {'batches': 0, 'items': 0, 'missed': 0, 'failed_batches': 0, 'singles': 0}
+    
+    async def submit(self, item: Any) -> Optional[Any]:
+        """Result for one item once its batch completes; None if the batch didn't cover it"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+    
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers cancelled while waiting (shutdown, shedding) don't need a slot in the request
+        batch = [(item, future) for item, future in self._pending if not future.done()]
+        self._pending = []
+        if len(batch) < self.min_items:
+            self.stats['singles'] += len(batch)
+            for _, future in batch:
+                future.set_result(None)
+            return
+        
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.stats['batches'] += 1
+        self.stats['items'] += len(batch)
+        try:
+            results = list(await self.handler([item for item, _ in batch]))
+        except Exception as e:
+            logger.warning(f"⚠️ Batch of {len(batch)} failed, items fall back to single requests: {e}")
+            self.stats['failed_batches'] += 1
+            results = []
+        
+        results += [None] * (len(batch) - len(results))
+        for (_, future), result in zip(batch, results):
+            if result is None:
+                self.stats['missed'] += 1
+            if not future.done():
+                future.set_result(result)
+    
+    def close(self):
+        """Cancel pending items and in-flight batches (on shutdown nobody waits for them)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        for task in self._tasks:
+            task.cancel()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        batches = self.stats['batches']
+        return dict(self.stats, avg_batch_size=round(self.stats['items'] / batches, 2) if batches else 0.0,
+                    pending=len(self._pending))
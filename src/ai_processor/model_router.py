@@ -0,0 +1,205 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+from src.ai_processor.rate_limiter import is_rate_limit_error
+from src.ai_processor.response_cache import model_name
+
+# Errors tied to one model / deployment rather than to the request itself
+FAILOVER_MARKERS = ('404', 'not found', '500', '502', '503', '504', 'unavailable', 'deadline', 'internal')
+
+
+def is_failover_error(error: Exception) -> bool:
+    """Whether another model could plausibly answer the same request (429, 404, 5xx, timeouts)"""
+    if isinstance(error, asyncio.TimeoutError) or is_rate_limit_error(error):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in FAILOVER_MARKERS)
+
+
+def _consume_result(task: asyncio.Future):
+    """Mark a losing duplicate's error as retrieved (it was expected, not lost)"""
+    if not task.cancelled():
+        task.exception()
+
+
+class ModelHealth:
+    """Latency / error window of one model over the last window_seconds"""
+    
+    def __init__(self, model, window_seconds: float = 300, max_samples: int = 200):
+        self.model = model
+        self.name = model_name(model)
+        self.window_seconds = window_seconds
+        self._samples = deque(maxlen=max_samples)   # (finished_at, seconds, ok)
+        self.stats = {'requests': 0, 'errors': 0, 'wins': 0}
+    
+    def record(self, seconds: float, ok: bool):
+        self._samples.append((time.monotonic(), seconds, ok))
+        self.stats['requests'] += 1
+        if not ok:
+            self.stats['errors'] += 1
+    
+    def _recent(self) -> List[tuple]:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return list(self._samples)
+    
+    @property
+    def error_rate(self) -> float:
+        samples = self._recent()
+        return sum(1 for _, _, ok in samples if not ok) / len(samples) if samples else 0.0
+    
+    @property
+    def sample_count(self) -> int:
+        return len(self._recent())
+    
+    def p95(self) -> Optional[float]:
+        """95th percentile latency of successful calls, None until there are any"""
+        latencies = sorted(seconds for _, seconds, ok in self._recent() if ok)
+        if not latencies:
+            return None
+        return latencies[min(math.ceil(0.95 * len(latencies)) - 1, len(latencies) - 1)]
+    
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return dict(self.stats, p95=round(p95, 2) if p95 is not None else None,
+                    error_rate=round(self.error_rate, 3))
+
+
+class ModelRouter:
+    """Ordered Gemini models with health-based routing, hedged duplicates and failover"""
+    
+    def __init__(self, models: List[Any], call: Callable[[Any, Any, Any], Awaitable[Any]],
+                 hedge: bool = True, hedge_delay: float = 4.0, min_hedge_delay: float = 1.5,
+                 error_threshold: float = 0.5, min_samples: int = 5, window_seconds: float = 300,
+                 reserve: Optional[Callable[[Any, Any], Awaitable[None]]] = None):
+        # call(model, contents, generation_config) performs one request; reserve() pays quota for extra ones
+        self.models = [ModelHealth(model, window_seconds) for model in models]
+        self.call = call
+        self.hedge = hedge and len(models) > 1
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.error_threshold = error_threshold
+        self.min_samples = min_samples
+        self.reserve = reserve
+        
+        self.stats = {'requests': 0, 'hedges': 0, 'hedge_wins': 0, 'failovers': 0}
+    
+    @property
+    def model_name(self) -> str:
+        """Name of the preferred model (keeps response cache keys stable)"""
+        return self.models[0].name
+    
+    def ordered(self) -> List[ModelHealth]:
+        """Config order, with models over the error threshold moved to the back"""
+        def unhealthy(health: ModelHealth) -> bool:
+            return health.sample_count >= self.min_samples and health.error_rate >= self.error_threshold
+        return sorted(self.models, key=unhealthy)
+    
+    def _hedge_after(self, primary: ModelHealth) -> float:
+        """Hedge once the primary is slower than its usual p95 (bounded by the configured delays)"""
+        p95 = primary.p95() if primary.sample_count >= self.min_samples else None
+        if p95 is None:
+            return self.hedge_delay
+        return min(max(p95, self.min_hedge_delay), self.hedge_delay)
+    
+    async def generate(self, contents, generation_config=None):
+        """First successful answer from the routed models; raises the last error if all fail"""
+        self.stats['requests'] += 1
+        candidates = self.ordered()
+        pending: Dict[asyncio.Future, tuple] = {}   # task -> (health, started)
+        reserving: Optional[asyncio.Future] = None  # quota wait for the next launch
+        launched = 0
+        hedged = False
+        won = False
+        last_error: Optional[Exception] = None
+        
+        def launch():
+            nonlocal launched
+            health = candidates[launched]
+            launched += 1
+            task = asyncio.ensure_future(self.call(health.model, contents, generation_config))
+            task.add_done_callback(_consume_result)
+            pending[task] = (health, time.monotonic())
+        
+        def launch_next():
+            # Wait for quota alongside the requests in flight, so their answers are never held back by it
+            nonlocal reserving
+            if self.reserve is None:
+                launch()
+            else:
+                reserving = asyncio.ensure_future(self.reserve(contents, generation_config))
+                reserving.add_done_callback(_consume_result)
+        
+        launch()
+        try:
+            while pending or reserving is not None:
+                can_hedge = self.hedge and not hedged and reserving is None and launched < len(candidates)
+                waiting = set(pending) | ({reserving} if reserving is not None else set())
+                done, _ = await asyncio.wait(waiting, timeout=self._hedge_after(candidates[0]) if can_hedge else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is slow: race a duplicate request on the next model
+                    hedged = True
+                    self.stats['hedges'] += 1
+                    launch_next()
+                    continue
+                
+                for task in done:
+                    if task is reserving:
+                        continue
+                    health, started = pending.pop(task)
+                    error = task.exception()
+                    health.record(time.monotonic() - started, ok=error is None)
+                    if error is None:
+                        won = True
+                        health.stats['wins'] += 1
+                        if health is not candidates[0]:
+                            self.stats['hedge_wins' if hedged else 'failovers'] += 1
+                        return task.result()
+                    last_error = error
+                    logger.debug(f"🔀 {health.name} failed: {str(error)[:100]}")
+                
+                if reserving in done:
+                    error = reserving.exception()
+                    reserving = None
+                    if error is None:
+                        launch()
+                    else:
+                        logger.debug(f"🔀 No quota for {candidates[launched].name}: {str(error)[:100]}")
+                        if not pending:
+                            raise last_error or error
+                
+                # Everything in flight failed: go to the next model now instead of waiting for a hedge
+                if not pending and reserving is None and launched < len(candidates) and is_failover_error(last_error):
+                    logger.warning(f"🔀 Failing over to {candidates[launched].name}: {str(last_error)[:80]}")
+                    launch_next()
+            raise last_error
+        finally:
+            if reserving is not None:
+                reserving.cancel()
+            for task, (health, started) in pending.items():
+                elapsed = time.monotonic() - started
+                if task.done() and not task.cancelled():
+                    health.record(elapsed, ok=task.exception() is None)
+                elif won:
+                    # A lost race still shows the model took at least this long
+                    health.record(elapsed, ok=True)
+                else:
+                    # Timed out / cancelled with no answer from any model: the hang counts against it
+                    health.record(elapsed, ok=False)
+                task.cancel()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, models={health.name: health.snapshot() for health in self.models})
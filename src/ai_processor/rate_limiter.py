@@ -0,0 +1,149 @@
+import asyncio
+import re
+import time
+from typing import Dict, Any, Optional
+
+# Retry hints found in Gemini 429 errors ("retry_delay { seconds: 12 }") or HTTP headers
+RETRY_DELAY_RE = re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)', re.IGNORECASE)
+RETRY_AFTER_RE = re.compile(r'retry[-_ ]after["\']?\s*[:=]?\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+
+# Rough token accounting: ~4 characters per token, fixed cost per image
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 258
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an API error is a 429 / quota rejection"""
+    message = str(error)
+    return "429" in message or "quota" in message.lower() or "resource exhausted" in message.lower()
+
+
+def parse_retry_delay(error: Exception) -> Optional[float]:
+    """Extract the server-suggested retry delay (seconds) from a rate limit error"""
+    message = str(error)
+    match = RETRY_DELAY_RE.search(message) or RETRY_AFTER_RE.search(message)
+    if match:
+        return float(match.group(1))
+    
+    # HTTP errors may carry the header on the response object
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    retry_after = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except ValueError:
+        return None
+
+
+def estimate_tokens(contents: Any, max_output_tokens: int = 0) -> int:
+    """Estimate prompt + completion tokens for a generate_content call"""
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    tokens = max_output_tokens
+    for part in parts:
+        if isinstance(part, str):
+            tokens += len(part) // CHARS_PER_TOKEN + 1
+        else:
+            tokens += IMAGE_TOKENS
+    return tokens
+
+
+class TokenBucket:
+    """Continuously refilling bucket of `capacity` units per minute"""
+    __slots__ = ('capacity', 'rate', 'available', 'updated')
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)"""
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+
+class GeminiRateLimiter:
+    """Shared requests-per-minute / tokens-per-minute limiter with 429 backoff"""
+    
+    def __init__(self, requests_per_minute: float = 15, tokens_per_minute: float = 1000000,
+                 max_backoff: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_backoff = max_backoff
+        
+        self._lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self._consecutive_limits = 0
+        
+        self.stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0, 'rate_limited': 0}
+    
+    async def acquire(self, estimated_tokens: int = 0) -> float:
+        """Wait until one request and `estimated_tokens` fit the budget; returns seconds waited"""
+        waited = 0.0
+        # The lock keeps waiters FIFO so a large request is not starved by small ones
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.requests.refill(now)
+                self.tokens.refill(now)
+                delay = max(self._blocked_until - now,
+                            self.requests.wait_time(1),
+                            self.tokens.wait_time(estimated_tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+                waited += delay
+            
+            self.requests.available -= 1
+            self.tokens.available -= min(estimated_tokens, self.tokens.capacity)
+        
+        self.stats['acquired'] += 1
+        if waited:
+            self.stats['waited'] += 1
+            self.stats['wait_seconds'] = round(self.stats['wait_seconds'] + waited, 3)
+        return waited
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token budget once the real usage is known"""
+        self._consecutive_limits = 0
+        if actual_tokens is not None:
+            self.tokens.available = min(self.tokens.capacity,
+                                        self.tokens.available + estimated_tokens - actual_tokens)
+    
+    def on_rate_limited(self, error: Exception) -> float:
+        """Back off after a 429; honours the server retry delay, else exponential backoff"""
+        self._consecutive_limits += 1
+        self.stats['rate_limited'] += 1
+        
+        delay = parse_retry_delay(error)
+        if delay is None:
+            delay = 2.0 ** self._consecutive_limits
+        delay = min(delay, self.max_backoff)
+        
+        # Our view of the quota was too optimistic - empty the request bucket as well
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + delay)
+        self.requests.refill(now)
+        self.requests.available = 0.0
+        return delay
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Current budget and counters for status reporting"""
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return dict(
+            self.stats,
+            requests_available=round(self.requests.available, 2),
+            requests_per_minute=self.requests.capacity,
+            tokens_available=int(self.tokens.available),
+            tokens_per_minute=int(self.tokens.capacity),
+            backoff_remaining=round(max(self._blocked_until - now, 0.0), 2)
+        )
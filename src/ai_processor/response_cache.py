@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+
+
+def model_name(model) -> str:
+    """Name of a genai.GenerativeModel (e.g. models/gemini-1.5-flash)"""
+    return getattr(model, 'model_name', None) or type(model).__name__
+
+
+def _digest_part(part: Any) -> bytes:
+    """Stable bytes for one key component; text is whitespace-normalized"""
+    if part is None:
+        return b''
+    if isinstance(part, bytes):
+        return hashlib.sha256(part).digest()
+    if isinstance(part, str):
+        return ' '.join(part.split()).encode('utf-8')
+    if hasattr(part, 'tobytes') and hasattr(part, 'size'):
+        # PIL image without a precomputed file digest
+        return hashlib.sha256(part.tobytes()).digest()
+    if isinstance(part, (list, tuple)):
+        return b'\x1e'.join(_digest_part(item) for item in part)
+    return repr(part).encode('utf-8')
+
+
+def make_cache_key(model, generation_config, *parts) -> str:
+    """Cache key from model name, sampling settings and normalized prompt content"""
+    settings = (getattr(generation_config, 'max_output_tokens', None),
+                getattr(generation_config, 'temperature', None))
+    digest = hashlib.sha256()
+    digest.update(f"{model_name(model)}|{settings}".encode('utf-8'))
+    for part in parts:
+        digest.update(b'\x1f' + _digest_part(part))
+    return digest.hexdigest()
+
+
+class CachedResponse:
+    """Stand-in for a generate_content response served from the cache"""
+    __slots__ = ('text',)
+    usage_metadata = None
+    
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ResponseCache:
+    """Two-tier Gemini response cache: in-memory LRU in front of a SQLite table, both with TTL"""
+    
+    def __init__(self, path: Optional[str] = "data/gemini_cache.db", ttl: float = 86400,
+                 max_entries: int = 512, max_disk_entries: int = 5000, enabled: bool = True):
+        self.enabled = enabled
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        
+        self._memory: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()   # key -> (expires_at, text)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_prune = 0
+        
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'expired': 0, 'evictions': 0}
+        
+        if self.enabled and self.path:
+            self._open_disk_tier()
+    
+    def _open_disk_tier(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                               "(key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses (expires_at)")
+            self._prune()
+            # The connection is only used from this thread after start-up
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gemini_cache')
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Gemini response cache: disk tier disabled ({e})")
+            self._conn = None
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Cached response text, or None on a miss"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return entry[1]
+            del self._memory[key]
+            self.stats['expired'] += 1
+        
+        if self._conn is not None:
+            loop = asyncio.get_running_loop()
+            row = await loop.run_in_executor(self._executor, self._disk_get, key, now)
+            if row is not None:
+                self._remember(key, row[1], row[0])
+                self.stats['disk_hits'] += 1
+                return row[1]
+        
+        self.stats['misses'] += 1
+        return None
+    
+    async def set(self, key: str, text: str):
+        """Store a response in both tiers"""
+        if not self.enabled or not text:
+            return
+        expires_at = time.time() + self.ttl
+        self._remember(key, text, expires_at)
+        self.stats['stores'] += 1
+        
+        if self._conn is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._executor, self._disk_set, key, text, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Gemini response cache write failed: {e}")
+    
+    def _remember(self, key: str, text: str, expires_at: float):
+        self._memory[key] = (expires_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+    
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        row = self._conn.execute("SELECT expires_at, response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] <= now:
+            return None
+        return row
+    
+    def _disk_set(self, key: str, text: str, expires_at: float):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                               (key, text, expires_at))
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= 100:
+            self._prune()
+    
+    def _prune(self):
+        """Drop expired rows and keep the newest max_disk_entries"""
+        with self._conn:
+            self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._conn.execute("DELETE FROM responses WHERE key NOT IN "
+                               "(SELECT key FROM responses ORDER BY expires_at DESC LIMIT ?)",
+                               (self.max_disk_entries,))
+        self._writes_since_prune = 0
+    
+    def close(self):
+        """Close the disk tier"""
+        if self._conn is not None:
+            self._executor.submit(self._conn.close)
+            self._executor.shutdown(wait=True)
+            self._conn = None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return dict(self.stats, hits=hits, hit_rate=round(hits / lookups, 3) if lookups else 0.0,
+                    memory_entries=len(self._memory))
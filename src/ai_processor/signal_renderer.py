@@ -0,0 +1,82 @@
+import re
+from typing import Dict, Any, Optional
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.trading_signal_praser import TradingSignal
+
+MISSING_VALUE = "N/A"
+ELLIPSIS = "…"
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+class _TemplateFields(dict):
+    """format_map mapping that renders unknown placeholders as N/A"""
+    
+    def __missing__(self, key: str) -> str:
+        return MISSING_VALUE
+
+
+def _format_price(value: float) -> str:
+    """Exact parsed price (never rounded), without a trailing .0 on whole numbers"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_level(value: Optional[float]) -> str:
+    return _format_price(value) if value else MISSING_VALUE
+
+
+class SignalRenderer:
+    """Render message_format.template locally from a parsed trading signal"""
+    
+    def __init__(self, template: str, max_length: int = 400):
+        self.template = template.strip()
+        self.max_length = max_length
+    
+    def render(self, signal: TradingSignal, message_data: Dict[str, Any], analysis: Optional[str] = None) -> str:
+        """Fill the notification template, shortening the analysis to respect max_length"""
+        if analysis is None:
+            analysis = self._default_analysis(message_data)
+        
+        text = self._fill(signal, message_data, analysis)
+        overflow = len(text) - self.max_length
+        if overflow > 0 and analysis:
+            # Shorten the free-text analysis first, keep the levels intact
+            keep = max(len(analysis) - overflow - len(ELLIPSIS), 0)
+            analysis = analysis[:keep].rstrip() + ELLIPSIS if keep else ""
+            text = self._fill(signal, message_data, analysis)
+        
+        if len(text) > self.max_length:
+            text = text[:self.max_length - len(ELLIPSIS)].rstrip() + ELLIPSIS
+        return text
+    
+    def _fill(self, signal: TradingSignal, message_data: Dict[str, Any], analysis: str) -> str:
+        take_profit = ", ".join(_format_price(level) for level in signal.take_profit) or MISSING_VALUE
+        fields = _TemplateFields(
+            instrument=signal.instrument or MISSING_VALUE,
+            entry=_format_level(signal.entry_price),
+            stop_loss=_format_level(signal.stop_loss),
+            take_profit=take_profit,
+            risk_reward=signal.risk_reward or MISSING_VALUE,
+            direction=signal.direction or MISSING_VALUE,
+            timeframe=signal.timeframe or MISSING_VALUE,
+            analysis=analysis or MISSING_VALUE,
+            sender=message_data.get('sender_name', 'Unknown'),
+            source=message_data.get('chat_title') or message_data.get('source', 'Unknown')
+        )
+        try:
+            return self.template.format_map(fields)
+        except (ValueError, IndexError):
+            # Malformed template (stray braces) - fall back to a plain layout
+            return (f"🔔 **FOREX TRADE SIGNAL**\n\n📈 **Instrument**: {fields['instrument']}\n"
+                    f"📱 **Direction**: {fields['direction']}\n💰 **Entry**: {fields['entry']}\n"
+                    f"🛑 **Stop Loss**: {fields['stop_loss']}\n🎯 **Take Profit**: {fields['take_profit']}")
+    
+    def _default_analysis(self, message_data: Dict[str, Any]) -> str:
+        """Original message text collapsed to a single line"""
+        return WHITESPACE_RE.sub(' ', message_data.get('text') or '').strip()
@@ -0,0 +1,146 @@
+import json
+import re
+from typing import Dict, Any, Optional, Tuple
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.trading_signal_praser import TradingSignal, TradingSignalParser, PRICE_PATTERN, parse_price
+
+# Keys of the JSON object the model is asked for
+SIGNAL_JSON_FIELDS = ('instrument', 'timeframe', 'direction', 'entry', 'stop_loss', 'take_profit',
+                      'risk_reward', 'notes')
+SIGNAL_JSON_EXAMPLE = ('{"instrument": "XAUUSD", "timeframe": "15m", "direction": "BUY", "entry": 3361.06, '
+                       '"stop_loss": 3355.62, "take_profit": [3381.01], "risk_reward": "1:3.7", '
+                       '"notes": "Strong support, bullish momentum"}')
+
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+PRICE_RE = re.compile(PRICE_PATTERN)
+DIRECTIONS = {'BUY': 'BUY', 'LONG': 'BUY', 'SELL': 'SELL', 'SHORT': 'SELL'}
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in a model reply (tolerates code fences and surrounding prose)"""
+    if not text:
+        return None
+    match = JSON_OBJECT_RE.search(text)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group())
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def coerce_price(value: Any) -> Optional[float]:
+    """Number from a JSON value: 3361.06, "3,361.06", "3361 (approx)"; None for "Not visible" etc."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    match = PRICE_RE.search(str(value))
+    return parse_price(match.group()) if match else None
+
+
+def coerce_direction(value: Any) -> Optional[str]:
+    words = re.findall(r'[A-Z]+', str(value or '').upper())
+    return next((DIRECTIONS[word] for word in words if word in DIRECTIONS), None)
+
+
+def _text(value: Any) -> Optional[str]:
+    text = str(value).strip() if value is not None else ''
+    if not text or text.lower() in ('null', 'none', 'n/a', 'not visible', 'not specified', 'unknown'):
+        return None
+    return text
+
+
+def build_signal(instrument: Optional[str], direction: Optional[str], entry_price: Optional[float],
+                 stop_loss: Optional[float], take_profit: Tuple[float, ...], risk_reward: Optional[str],
+                 timeframe: Optional[str], source_text: str = '') -> TradingSignal:
+    """TradingSignal with confidence / validity computed by the parser's rules"""
+    if risk_reward is None and entry_price and stop_loss and take_profit:
+        risk = abs(entry_price - stop_loss)
+        if risk > 0:
+            risk_reward = f"1:{abs(take_profit[0] - entry_price) / risk:.1f}"
+    
+    # 20% per populated field; valid = instrument + direction + any level, as in _validate_signal
+    confidence = sum(0.2 for value in (instrument, direction, entry_price, stop_loss, take_profit) if value)
+    has_price = bool(entry_price or stop_loss or take_profit)
+    return TradingSignal(
+        instrument=instrument,
+        direction=direction,
+        entry_price=entry_price,
+        stop_loss=stop_loss,
+        take_profit=tuple(take_profit),
+        risk_reward=risk_reward,
+        timeframe=timeframe,
+        confidence=confidence,
+        is_valid_signal=bool(instrument and direction and has_price and confidence >= 0.4),
+        source_text=source_text
+    )
+
+
+def _drop_wrong_side(direction: Optional[str], entry_price: Optional[float], stop_loss: Optional[float],
+                     take_profit: Tuple[float, ...]) -> Tuple[Optional[float], Tuple[float, ...]]:
+    """Levels on the wrong side of the entry are misreads; drop them rather than alert on them"""
+    if not direction or not entry_price:
+        return stop_loss, tuple(take_profit)
+    sign = 1 if direction == 'BUY' else -1
+    if stop_loss and sign * (entry_price - stop_loss) <= 0:
+        stop_loss = None
+    return stop_loss, tuple(price for price in take_profit if sign * (price - entry_price) > 0)
+
+
+def signal_from_json(data: Dict[str, Any], parser: TradingSignalParser) -> Tuple[TradingSignal, Optional[str]]:
+    """Validate a model-produced signal object; returns (signal, notes)"""
+    raw_instrument = _text(data.get('instrument'))
+    instrument = None
+    if raw_instrument:
+        # Canonical symbol via the parser's aliases ("Gold Spot / U.S. Dollar" -> XAUUSD)
+        instrument = (parser.matcher.match(raw_instrument.upper()).instrument
+                      or re.sub(r'[^A-Z0-9]', '', raw_instrument.upper())[:12] or None)
+    
+    direction = coerce_direction(data.get('direction'))
+    entry_price = coerce_price(data.get('entry'))
+    stop_loss = coerce_price(data.get('stop_loss'))
+    
+    take_profit = data.get('take_profit')
+    if not isinstance(take_profit, (list, tuple)):
+        take_profit = [take_profit]
+    take_profit = [price for price in map(coerce_price, take_profit) if price]
+    stop_loss, take_profit = _drop_wrong_side(direction, entry_price, stop_loss, tuple(take_profit))
+    
+    risk_reward = _text(data.get('risk_reward'))
+    signal = build_signal(instrument, direction, entry_price, stop_loss, take_profit,
+                          risk_reward, _text(data.get('timeframe')))
+    return signal, _text(data.get('notes'))
+
+
+def merge_signals(local: Optional[TradingSignal], remote: TradingSignal) -> TradingSignal:
+    """Field-by-field merge; the parser's values (exact numbers from the text) win, the model fills gaps"""
+    if local is None:
+        return remote
+    
+    def pick(field: str):
+        return getattr(local, field) or getattr(remote, field)
+    
+    direction = pick('direction')
+    entry_price = pick('entry_price')
+    stop_loss, take_profit = _drop_wrong_side(direction, entry_price, pick('stop_loss'), pick('take_profit'))
+    # A ratio only holds for the levels it was computed from
+    risk_reward = local.risk_reward if local.stop_loss or local.take_profit else remote.risk_reward
+    return build_signal(pick('instrument'), direction, entry_price, stop_loss, take_profit,
+                        risk_reward, pick('timeframe'), source_text=local.source_text)
+
+
+def parse_signal_reply(text: str, parser: TradingSignalParser) -> Optional[Tuple[TradingSignal, Optional[str]]]:
+    """(signal, notes) from a JSON model reply, or None if it isn't a usable object"""
+    data = extract_json_object(text)
+    if data is None:
+        return None
+    return signal_from_json(data, parser)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Trading signal parser micro-benchmark
+Runs the parser over a seeded synthetic corpus and writes a JSON report
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.benchmarks.signal_corpus import generate_corpus, CorpusMessage, SIGNAL, HARD_CASES
+from src.utils.trading_signal_praser import TradingSignalParser, TradingSignal, NUMPY_AVAILABLE
+from src.ai_processor.signal_renderer import SignalRenderer
+
+PRICE_TOLERANCE = 1e-6
+DEFAULT_OUTPUT = os.path.join(current_dir, 'parser_benchmark.json')
+FIELDS = ('instrument', 'direction', 'entry_price', 'stop_loss', 'take_profit')
+# Levels-only notification template: the rendered prices must round-trip to the parsed values exactly
+LEVELS_TEMPLATE = "{entry}|{stop_loss}|{take_profit}"
+
+
+def _percentile(sorted_values: List[int], fraction: float) -> float:
+    """Nearest-rank percentile of pre-sorted values"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return float(sorted_values[index])
+
+
+def _time_calls(func: Callable[[Any], Any], inputs: List[Any], repeat: int = 3) -> Dict[str, Any]:
+    """Call func once per input and collect per-call latency (best of `repeat` runs)"""
+    clock = time.perf_counter_ns
+    best = None
+    for _ in range(max(repeat, 1)):
+        latencies = []
+        results = []
+        started = clock()
+        for item in inputs:
+            call_start = clock()
+            results.append(func(item))
+            latencies.append(clock() - call_start)
+        total_ns = clock() - started
+        if best is None or total_ns < best[0]:
+            best = (total_ns, latencies, results)
+    
+    total_ns, latencies, results = best
+    latencies.sort()
+    return {
+        'results': results,
+        'stats': {
+            'messages': len(inputs),
+            'messages_per_sec': round(len(inputs) / (total_ns / 1e9), 1) if total_ns else 0.0,
+            'mean_us': round(sum(latencies) / len(latencies) / 1000, 2) if latencies else 0.0,
+            'p50_us': round(_percentile(latencies, 0.50) / 1000, 2),
+            'p99_us': round(_percentile(latencies, 0.99) / 1000, 2),
+            'max_us': round(latencies[-1] / 1000, 2) if latencies else 0.0
+        }
+    }
+
+
+def _same_price(actual: Optional[float], expected: Optional[float]) -> bool:
+    if actual is None or expected is None:
+        return actual is expected
+    return abs(actual - expected) <= PRICE_TOLERANCE
+
+
+def _field_matches(field: str, actual: Any, expected: Any) -> bool:
+    if field in ('entry_price', 'stop_loss'):
+        return _same_price(actual, expected)
+    if field == 'take_profit':
+        return len(actual) == len(expected) and all(_same_price(a, e) for a, e in zip(actual, expected))
+    return actual == expected
+
+
+def signal_accuracy(corpus: List[CorpusMessage], signals: List[TradingSignal]) -> Dict[str, float]:
+    """Field-level accuracy over signal messages plus validity accuracy over everything"""
+    field_hits = {field: 0 for field in FIELDS}
+    signal_count = 0
+    validity_hits = 0
+    
+    for message, signal in zip(corpus, signals):
+        if signal.is_valid_signal == message.expected['is_valid_signal']:
+            validity_hits += 1
+        if message.kind != SIGNAL:
+            continue
+        signal_count += 1
+        for field in FIELDS:
+            if _field_matches(field, getattr(signal, field), message.expected[field]):
+                field_hits[field] += 1
+    
+    accuracy = {field: round(hits / max(signal_count, 1), 4) for field, hits in field_hits.items()}
+    accuracy['is_valid_signal'] = round(validity_hits / max(len(corpus), 1), 4)
+    accuracy['all_fields'] = round(min(accuracy[field] for field in FIELDS), 4)
+    return accuracy
+
+
+def _matches_expected(message: CorpusMessage, signal: TradingSignal) -> bool:
+    """Validity and (for signals) every field as labelled"""
+    if signal.is_valid_signal != message.expected['is_valid_signal']:
+        return False
+    if message.kind != SIGNAL:
+        return True
+    return all(_field_matches(field, getattr(signal, field), message.expected[field]) for field in FIELDS)
+
+
+def relevance_accuracy(corpus: List[CorpusMessage], flags: List[bool]) -> Dict[str, float]:
+    """Accuracy / precision / recall of is_forex_related against the corpus labels"""
+    true_positive = sum(1 for message, flag in zip(corpus, flags) if flag and message.is_trading)
+    false_positive = sum(1 for message, flag in zip(corpus, flags) if flag and not message.is_trading)
+    false_negative = sum(1 for message, flag in zip(corpus, flags) if not flag and message.is_trading)
+    correct = sum(1 for message, flag in zip(corpus, flags) if flag == message.is_trading)
+    return {
+        'accuracy': round(correct / max(len(corpus), 1), 4),
+        'precision': round(true_positive / max(true_positive + false_positive, 1), 4),
+        'recall': round(true_positive / max(true_positive + false_negative, 1), 4)
+    }
+
+
+def summary_accuracy(corpus: List[CorpusMessage], signals: List[TradingSignal], summaries: List[str]) -> Dict[str, float]:
+    """Check rendered summaries and notifications carry the expected instrument, direction and exact levels"""
+    renderer = SignalRenderer(LEVELS_TEMPLATE)
+    header_hits = 0
+    level_hits = 0
+    rendered_hits = 0
+    signal_count = 0
+    
+    for message, signal, summary in zip(corpus, signals, summaries):
+        if message.kind != SIGNAL:
+            continue
+        signal_count += 1
+        expected = message.expected
+        if summary.startswith(f"📈 **{expected['instrument']}** {expected['direction']}"):
+            header_hits += 1
+        
+        take_profits = expected['take_profit']
+        if len(take_profits) == 1:
+            take_profit_line = f"Take Profit: {take_profits[0]}\n"
+        else:
+            take_profit_line = f"Take Profits: {', '.join(map(str, take_profits))}\n"
+        levels = [f"Entry: {expected['entry_price']}\n", f"Stop Loss: {expected['stop_loss']}\n", take_profit_line]
+        if all(level in summary for level in levels):
+            level_hits += 1
+        
+        # The notifier must send the parsed stop-loss / take-profit, not a rounded version of it
+        entry, stop_loss, take_profit = renderer.render(signal, {}).split('|')
+        try:
+            rendered = ([float(entry), float(stop_loss)], [float(level) for level in take_profit.split(', ')])
+        except ValueError:
+            continue
+        if rendered == ([expected['entry_price'], expected['stop_loss']], take_profits):
+            rendered_hits += 1
+    
+    return {
+        'header': round(header_hits / max(signal_count, 1), 4),
+        'levels': round(level_hits / max(signal_count, 1), 4),
+        'rendered_levels': round(rendered_hits / max(signal_count, 1), 4)
+    }
+
+
+def run_benchmark(count: int, seed: int, repeat: int = 3) -> Dict[str, Any]:
+    """Run every parser benchmark and return the report"""
+    corpus = generate_corpus(count=count, seed=seed)
+    texts = [message.text for message in corpus]
+    parser = TradingSignalParser()
+    
+    # Warm up caches so the first calls don't skew p99
+    for text in texts[:200]:
+        parser.extract_trading_signal(text)
+    
+    extract = _time_calls(parser.extract_trading_signal, texts, repeat)
+    relevance = _time_calls(parser.is_forex_related, texts, repeat)
+    summary = _time_calls(parser.format_signal_summary, extract['results'], repeat)
+    
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'seed': seed,
+            'messages': count,
+            'repeat': repeat,
+            'signal_messages': sum(1 for message in corpus if message.kind == SIGNAL),
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'extract_trading_signal': dict(extract['stats'],
+                                       accuracy=signal_accuracy(corpus, extract['results'])),
+        'is_forex_related': dict(relevance['stats'],
+                                 accuracy=relevance_accuracy(corpus, relevance['results'])),
+        'format_signal_summary': dict(summary['stats'],
+                                      accuracy=summary_accuracy(corpus, extract['results'], summary['results']))
+    }
+    
+    # Hand-labelled adversarial messages: the accuracy numbers that can actually regress
+    hard_signals = [parser.extract_trading_signal(message.text) for message in HARD_CASES]
+    report['hard_cases'] = {
+        'messages': len(HARD_CASES),
+        'accuracy': signal_accuracy(HARD_CASES, hard_signals),
+        'misparsed': [message.text for message, signal in zip(HARD_CASES, hard_signals)
+                      if not _matches_expected(message, signal)]
+    }
+    
+    if NUMPY_AVAILABLE:
+        elapsed = float('inf')
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            parser.parse_many(texts)
+            elapsed = min(elapsed, time.perf_counter() - started)
+        report['parse_many'] = {
+            'messages': count,
+            'messages_per_sec': round(count / elapsed, 1) if elapsed else 0.0
+        }
+    
+    return report
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """List throughput drops beyond max_regression and any accuracy drop"""
+    problems = []
+    for name in ('extract_trading_signal', 'is_forex_related', 'format_signal_summary', 'hard_cases'):
+        current, previous = report.get(name), baseline.get(name)
+        if not current or not previous:
+            continue
+        
+        old_rate, new_rate = previous.get('messages_per_sec'), current.get('messages_per_sec')
+        if old_rate and new_rate is not None and new_rate < old_rate * (1 - max_regression):
+            problems.append(f"{name}: throughput {new_rate:.0f}/s vs baseline {old_rate:.0f}/s")
+        
+        for metric, old_value in previous.get('accuracy', {}).items():
+            new_value = current.get('accuracy', {}).get(metric)
+            if new_value is not None and new_value < old_value:
+                problems.append(f"{name}: accuracy.{metric} {new_value} vs baseline {old_value}")
+    
+    return problems
+
+
+def main():
+    """CLI entry point"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark the trading signal parser")
+    arg_parser.add_argument('--count', type=int, default=20000, help="number of synthetic messages")
+    arg_parser.add_argument('--seed', type=int, default=1337, help="corpus random seed")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="timing runs per function (best is kept)")
+    arg_parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSON report path")
+    arg_parser.add_argument('--baseline', help="previous JSON report to compare against")
+    arg_parser.add_argument('--max-regression', type=float, default=0.15,
+                            help="allowed throughput drop vs baseline (fraction)")
+    args = arg_parser.parse_args()
+    
+    report = run_benchmark(args.count, args.seed, args.repeat)
+    
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    
+    for name in ('extract_trading_signal', 'is_forex_related', 'format_signal_summary'):
+        stats = report[name]
+        print(f"{name:<24} {stats['messages_per_sec']:>10.0f} msg/s  "
+              f"p50 {stats['p50_us']:>7.1f}us  p99 {stats['p99_us']:>7.1f}us  accuracy {stats['accuracy']}")
+    hard_cases = report['hard_cases']
+    print(f"{'hard_cases':<24} {hard_cases['messages'] - len(hard_cases['misparsed'])}/{hard_cases['messages']} "
+          f"parsed as labelled  accuracy {hard_cases['accuracy']}")
+    if 'parse_many' in report:
+        print(f"{'parse_many':<24} {report['parse_many']['messages_per_sec']:>10.0f} msg/s")
+    print(f"📊 Report written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        problems = compare_to_baseline(report, baseline, args.max_regression)
+        if problems:
+            print("❌ Parser regressions vs baseline:")
+            for problem in problems:
+                print(f"   - {problem}")
+            sys.exit(1)
+        print("✅ No parser regressions vs baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import random
+from typing import Dict, List, Optional, Any
+
+# Message classes
+SIGNAL = 'signal'      # complete trading signal
+CHATTER = 'chatter'    # trading talk without a tradable setup
+NOISE = 'noise'        # unrelated chat
+
+# Instruments with realistic price ranges and decimals
+INSTRUMENTS = {
+    'EURUSD': (1.05, 1.12, 5), 'GBPUSD': (1.22, 1.32, 5), 'USDJPY': (140.0, 158.0, 3),
+    'AUDUSD': (0.63, 0.69, 5), 'USDCAD': (1.33, 1.39, 5), 'GBPJPY': (185.0, 200.0, 3),
+    'XAUUSD': (2300.0, 3450.0, 2), 'XAGUSD': (26.0, 34.0, 3),
+    'BTCUSD': (58000.0, 72000.0, 2), 'ETHUSD': (2900.0, 3900.0, 2)
+}
+
+# Alternative spellings seen in signal channels
+INSTRUMENT_SPELLINGS = {
+    'XAUUSD': ['XAUUSD', 'XAU/USD', 'Gold', 'GOLD', 'XAUUSDm'],
+    'BTCUSD': ['BTCUSD', 'BTC/USD', 'Bitcoin'],
+    'ETHUSD': ['ETHUSD', 'ETH/USD'],
+}
+
+DIRECTION_SPELLINGS = {'BUY': ['BUY', 'Buy', 'LONG', 'buy'], 'SELL': ['SELL', 'Sell', 'SHORT', 'sell']}
+ENTRY_LABELS = ['at', '@', 'Entry:', 'entry', 'now', '']
+SL_LABELS = ['SL', 'SL:', 'Stop Loss', 'stop', 'StopLoss:']
+TP_LABELS = ['TP', 'TP:', 'Take Profit', 'target', 'TGT']
+TIMEFRAMES = ['15m', '1H', 'H4', 'M30', '4H', '1D']
+EMOJIS = ['🔥', '🚀', '📈', '📉', '✅', '💰', '⚡']
+
+CHATTER_LINES = [
+    "Great week traders, we banked 350 pips in total 💰",
+    "Market analysis coming later today, stay tuned for the next signal",
+    "Remember: always use a stop, risk management is everything",
+    "Trend is your friend until it bends. Breakout traders be careful",
+    "Gold looking heavy near resistance, waiting for confirmation before any trade",
+    "TP1 hit on the last setup, move stop to breakeven",
+]
+
+NOISE_LINES = [
+    "Good morning everyone, hope you all had a nice weekend!",
+    "Join our VIP group for exclusive content, link in bio",
+    "Happy Friday! Enjoy your evening with family",
+    "Can someone share the recording of yesterday's webinar?",
+    "Thanks admin, really appreciate the help with my account",
+    "The meeting is moved to 7 pm, see you all there",
+    "Who is watching the match tonight? What a game yesterday",
+]
+
+FILLER_SENTENCES = [
+    "Please manage your lot size carefully.",
+    "Not financial advice, do your own research.",
+    "Wait for the candle close before entering.",
+    "Will update once the first target is reached.",
+    "Our members are doing really well this month.",
+    "Follow the plan and stay disciplined.",
+]
+
+
+class CorpusMessage:
+    """Synthetic message with its expected parse result"""
+    __slots__ = ('text', 'kind', 'expected')
+    
+    def __init__(self, text: str, kind: str, expected: Optional[Dict[str, Any]] = None):
+        self.text = text
+        self.kind = kind
+        self.expected = expected
+    
+    @property
+    def is_trading(self) -> bool:
+        return self.kind != NOISE
+
+
+def _format_price(rng: random.Random, value: float, decimals: int) -> str:
+    """Render a price, sometimes with thousands separators"""
+    if value >= 1000 and rng.random() < 0.4:
+        return f"{value:,.{decimals}f}"
+    return f"{value:.{decimals}f}"
+
+
+def _make_signal(rng: random.Random) -> CorpusMessage:
+    """Build one complete signal message with its ground truth"""
+    instrument = rng.choice(list(INSTRUMENTS))
+    low, high, decimals = INSTRUMENTS[instrument]
+    direction = rng.choice(['BUY', 'SELL'])
+    
+    entry = round(rng.uniform(low, high), decimals)
+    risk = entry * rng.uniform(0.002, 0.008)
+    side = 1 if direction == 'BUY' else -1
+    stop_loss = round(entry - side * risk, decimals)
+    take_profits = [round(entry + side * risk * multiple, decimals)
+                    for multiple in sorted(rng.sample([1.0, 1.5, 2.0, 3.0, 4.0], rng.randint(1, 3)))]
+    
+    spelling = instrument
+    if instrument in INSTRUMENT_SPELLINGS and rng.random() < 0.6:
+        spelling = rng.choice(INSTRUMENT_SPELLINGS[instrument])
+    elif len(instrument) == 6 and rng.random() < 0.3:
+        spelling = instrument[:3] + rng.choice(['/', '-']) + instrument[3:]
+    
+    parts = []
+    if rng.random() < 0.3:
+        parts.append(rng.choice(EMOJIS))
+    parts.append(f"{spelling} {rng.choice(DIRECTION_SPELLINGS[direction])}")
+    entry_label = rng.choice(ENTRY_LABELS)
+    parts.append(f"{entry_label} {_format_price(rng, entry, decimals)}".strip())
+    if rng.random() < 0.4:
+        parts.append(rng.choice(TIMEFRAMES))
+    
+    parts.append(f"{rng.choice(SL_LABELS)} {_format_price(rng, stop_loss, decimals)}")
+    if len(take_profits) == 1:
+        parts.append(f"{rng.choice(TP_LABELS)} {_format_price(rng, take_profits[0], decimals)}")
+    else:
+        for index, take_profit in enumerate(take_profits, 1):
+            parts.append(f"TP{index} {_format_price(rng, take_profit, decimals)}")
+    
+    separator = rng.choice([' ', ', ', '\n', ' | '])
+    text = separator.join(parts)
+    if rng.random() < 0.3:
+        text += '\n' + ' '.join(rng.sample(FILLER_SENTENCES, rng.randint(1, 3)))
+    
+    expected = {
+        'instrument': instrument,
+        'direction': direction,
+        'entry_price': entry,
+        'stop_loss': stop_loss,
+        'take_profit': take_profits,
+        'is_valid_signal': True
+    }
+    return CorpusMessage(text, SIGNAL, expected)
+
+
+def _make_chatter(rng: random.Random) -> CorpusMessage:
+    """Trading-related talk that is not an actionable signal"""
+    lines = rng.sample(CHATTER_LINES, rng.randint(1, 2))
+    if rng.random() < 0.3:
+        lines += rng.sample(FILLER_SENTENCES, rng.randint(2, 5))
+    return CorpusMessage(' '.join(lines), CHATTER, {'is_valid_signal': False})
+
+
+def _make_noise(rng: random.Random) -> CorpusMessage:
+    """Unrelated chat, occasionally long"""
+    count = rng.randint(1, 2) if rng.random() < 0.8 else rng.randint(6, 20)
+    lines = [rng.choice(NOISE_LINES) for _ in range(count)]
+    return CorpusMessage(' '.join(lines), NOISE, {'is_valid_signal': False})
+
+
+def _hard_signal(text: str, instrument: str, direction: str, entry_price: Optional[float],
+                 stop_loss: Optional[float], take_profit: List[float]) -> CorpusMessage:
+    return CorpusMessage(text, SIGNAL, {
+        'instrument': instrument, 'direction': direction, 'entry_price': entry_price,
+        'stop_loss': stop_loss, 'take_profit': take_profit, 'is_valid_signal': True
+    })
+
+
+# Hand-labelled messages in the style of real channels, labelled by reading them as a trader would
+# (not by running the parser). Conventions: an entry zone's entry is the first price quoted; stops
+# given in pips or as breakeven ("SL BE") are not price levels; "TPx open" is not a level.
+HARD_CASES = [
+    # Multiple take profits, mixed labels
+    _hard_signal("XAUUSD BUY 3361.06\nSL 3355.62\nTP1 3365\nTP2 3370\nTP3 3381.01",
+                 'XAUUSD', 'BUY', 3361.06, 3355.62, [3365.0, 3370.0, 3381.01]),
+    _hard_signal("EURUSD sell 1.0850 sl 1.0880 tp1 1.0820 tp2 1.0790 tp3 open",
+                 'EURUSD', 'SELL', 1.085, 1.088, [1.082, 1.079]),
+    _hard_signal("BTCUSD long 64,250 SL 63,500 TP 66,000 / 68,000",
+                 'BTCUSD', 'BUY', 64250.0, 63500.0, [66000.0, 68000.0]),
+    # Entry zones
+    _hard_signal("GOLD SELL NOW 3345 - 3350\nSL 3356\nTP 3335",
+                 'XAUUSD', 'SELL', 3345.0, 3356.0, [3335.0]),
+    _hard_signal("GBPUSD buy zone 1.2740/1.2730 stop 1.2700 target 1.2800",
+                 'GBPUSD', 'BUY', 1.274, 1.27, [1.28]),
+    # Numbers that are not prices (times, lot sizes, risk %)
+    _hard_signal("GBPUSD BUY @ 1.2750 at 14:30 GMT SL 1.2720 TP 1.2800",
+                 'GBPUSD', 'BUY', 1.275, 1.272, [1.28]),
+    _hard_signal("EURUSD SELL 1.0850 SL 1.0880 TP 1.0800 (risk 1% of account, 2 lots max)",
+                 'EURUSD', 'SELL', 1.085, 1.088, [1.08]),
+    # Stop given in pips: no stop price
+    _hard_signal("USDJPY BUY 151.20 SL 30 pips TP 152.00",
+                 'USDJPY', 'BUY', 151.2, None, [152.0]),
+    # Pending order types whose names contain other keywords
+    _hard_signal("SELL STOP EURUSD 1.0800 SL 1.0830 TP 1.0750",
+                 'EURUSD', 'SELL', 1.08, 1.083, [1.075]),
+    _hard_signal("Buy limit XAUUSD 3320 SL 3312 TP 3340",
+                 'XAUUSD', 'BUY', 3320.0, 3312.0, [3340.0]),
+    # Conflicting directions: the new trade is the signal
+    _hard_signal("Closed my SELL with profit. Now BUY EURUSD 1.0850 SL 1.0820 TP 1.0900",
+                 'EURUSD', 'BUY', 1.085, 1.082, [1.09]),
+    _hard_signal("gold buy now 3361.06 sl 3355.62 tp 3381.01 (ignore the earlier sell)",
+                 'XAUUSD', 'BUY', 3361.06, 3355.62, [3381.01]),
+    # Trade management and ambiguous talk: not new signals
+    CorpusMessage("XAUUSD TP1 hit ✅ SL BE, let the rest run", CHATTER, {'is_valid_signal': False}),
+    CorpusMessage("EURUSD running +40 pips, move SL to breakeven", CHATTER, {'is_valid_signal': False}),
+    CorpusMessage("Buy or sell EURUSD here? 1.0850 is a tough level", CHATTER, {'is_valid_signal': False}),
+    CorpusMessage("Last week: 12 signals, 9 wins, +420 pips. Next signal at 14:00", CHATTER,
+                  {'is_valid_signal': False}),
+]
+
+
+def generate_corpus(count: int = 10000, seed: int = 1337,
+                    signal_ratio: float = 0.4, chatter_ratio: float = 0.2) -> List[CorpusMessage]:
+    """Generate a reproducible mix of signal, chatter and noise messages"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < signal_ratio:
+            corpus.append(_make_signal(rng))
+        elif roll < signal_ratio + chatter_ratio:
+            corpus.append(_make_chatter(rng))
+        else:
+            corpus.append(_make_noise(rng))
+    return corpus
@@ -25,6 +25,12 @@ from scrapers.telegram_scraper import TelegramScraper
 # Updated import for Forex AI processor
 from ai_processor.forex_gemini_processor import ForexGeminiProcessor
 from notifications.fcm_notifier import FCMNotifier, PushbulletNotifier
+from utils.trading_signal_praser import TradingSignal
+from pipeline.message_pipeline import MessagePipeline
+from pipeline.priority_queue import PriorityMessageQueue, SignalPriorityClassifier
+from pipeline.load_shedder import LoadShedder, OVERFLOW, DROP, DOWNGRADE
+from pipeline.message_journal import MessageJournal
+from storage.message_store import MessageStore
 
 # Import FCM V1 notifier
 try:
@@ -55,8 +61,32 @@ class ForexMessageScraperApp:
         self.trading_signals_processed = 0
         self.start_time = None
         
-        # Message queue for processing
-        self.message_queue = asyncio.Queue()
+        # Staged processing: download → parse → AI → notify
+        pipeline_config = config.get('pipeline', {}) or {}
+        self.priority_classifier = self._build_priority_classifier(pipeline_config.get('priority', {}) or {})
+        self.load_shedder = self._build_load_shedder(pipeline_config.get('shedding', {}) or {})
+        self.pipeline = self._build_pipeline()
+        
+        # Write-ahead journal: queued messages survive restarts and crashes
+        journal_config = pipeline_config.get('journal', {}) or {}
+        self.journal = None
+        if journal_config.get('enabled', True):
+            self.journal = MessageJournal(
+                path=journal_config.get('path', 'data/pending_messages.journal'),
+                flush_interval=journal_config.get('flush_interval', 0.2),
+                compact_bytes=journal_config.get('compact_bytes', 1048576)
+            )
+        self.shutdown_drain = journal_config.get('shutdown_drain', 5) if self.journal else 30
+        
+        # Message / signal history (system.database_path)
+        database_config = system_config.get('database', {}) or {}
+        self.store = None
+        if database_config.get('enabled', True):
+            self.store = MessageStore(
+                path=system_config.get('database_path', 'data/forex_messages.db'),
+                batch_size=database_config.get('batch_size', 100),
+                flush_interval=database_config.get('flush_interval', 0.5)
+            )
         
         self.logger.info("🚀 Forex Message Scraper App initializing...")
     
@@ -142,94 +172,215 @@ class ForexMessageScraperApp:
             self.logger.debug(traceback.format_exc())
             return False
     
+    def _build_pipeline(self) -> MessagePipeline:
+        """Create the processing stages from the pipeline config"""
+        pipeline_config = config.get('pipeline', {}) or {}
+        preserve_order = pipeline_config.get('preserve_chat_order', True)
+        batching_config = config.get('gemini.batching', {}) or {}
+        pipeline = MessagePipeline(key_func=lambda message_data: message_data.get('chat_id'),
+                                   on_complete=self._on_message_complete)
+        
+        stages = [
+            ('download', self.download_stage, 2, 100, False),
+            ('parse', self.parse_stage, 1, 200, False),
+            ('ai', self.ai_stage, 4, 100, False),
+            ('notify', self.notify_stage, 2, 100, preserve_order)
+        ]
+        for name, handler, workers, queue_size, ordered in stages:
+            stage_config = pipeline_config.get(name, {}) or {}
+            queue_size = stage_config.get('queue_size', queue_size)
+            workers = stage_config.get('workers', workers)
+            if name == 'ai' and batching_config.get('enabled', False):
+                # A batch only fills up if that many messages are in the AI stage at once
+                workers = max(workers, batching_config.get('max_items', 4))
+            
+            # AI is the bottleneck stage: serve actionable signals first
+            queue = None
+            priority_config = pipeline_config.get('priority', {}) or {}
+            if name == 'ai' and priority_config.get('enabled', True):
+                queue = PriorityMessageQueue(queue_size, classify=self.priority_classifier,
+                                             aging_seconds=priority_config.get('aging_seconds', 15))
+            
+            pipeline.add_stage(name, handler,
+                               workers=workers,
+                               queue_size=queue_size,
+                               ordered=ordered,
+                               queue=queue)
+        return pipeline
+    
+    def _build_priority_classifier(self, priority_config: Dict[str, Any]) -> SignalPriorityClassifier:
+        """Classifier keyed on signal validity, confidence, subscribed pairs and message age"""
+        monitored_pairs = {pair.upper() for pair in config.get('forex_filters.monitored_pairs', []) or []}
+        return SignalPriorityClassifier(
+            is_monitored=monitored_pairs.__contains__,
+            high_confidence=priority_config.get('high_confidence', 0.8),
+            fresh_seconds=priority_config.get('fresh_seconds', 60),
+            subscriptions_configured=bool(monitored_pairs)
+        )
+    
+    def _build_load_shedder(self, shedding_config: Dict[str, Any]) -> LoadShedder:
+        """Staleness / overflow shedding from pipeline.shedding"""
+        return LoadShedder(
+            classify=self.priority_classifier.base_class,
+            max_age=shedding_config.get('max_age'),
+            stale_action=shedding_config.get('stale_action', DOWNGRADE),
+            notify_max_age=shedding_config.get('notify_max_age', 900),
+            enabled=shedding_config.get('enabled', True)
+        )
+    
     async def handle_new_message(self, message_data: Dict[str, Any]):
         """Handle new message from scrapers with trading context"""
         try:
-            # Add to processing queue
-            await self.message_queue.put(message_data)
-            
-            # Log with trading context
-            if message_data.get('is_trading_message', False):
-                signal_info = message_data.get('trading_signal', {})
-                instrument = signal_info.get('instrument', 'Unknown')
-                confidence = int(signal_info.get('confidence', 0) * 100)
-                self.logger.debug(f"📊 Trading signal queued: {instrument} ({confidence}% confidence) - ID: {message_data['id']}")
-            else:
+            if self.store:
+                self.store.record_message(message_data)
+            
+            # Bounded intake: never block the Telethon update handler
+            if self.pipeline.try_submit(message_data):
+                if self.journal:
+                    self.journal.append(message_data)
                 self.logger.debug(f"📥 Message queued for processing: {message_data['id']}")
+            else:
+                self._shed_overflow(message_data)
             
         except Exception as e:
             self.logger.error(f"❌ Error handling new message: {e}")
     
-    async def process_message_queue(self):
-        """Process messages from the queue with forex prioritization"""
-        self.logger.info("🔄 Starting forex message processing queue...")
+    def _on_message_complete(self, message_data: Dict[str, Any]):
+        """Message left the pipeline (notified, shed or failed) - acknowledge it in the journal"""
+        if self.journal:
+            self.journal.ack(message_data)
+    
+    async def _replay_journal(self, pending_messages: List[Dict[str, Any]]):
+        """Re-queue messages left unprocessed by the previous run"""
+        for message_data in pending_messages:
+            # Replayed messages go through staleness shedding like any other
+            await self.pipeline.submit(message_data)
+    
+    def _shed_overflow(self, message_data: Dict[str, Any]):
+        """Intake full: send parsed signals as parser-only alerts, drop the rest"""
+        message_data.pop('_telegram_message', None)
+        if self.load_shedder.check_expired(message_data):
+            self.logger.warning(f"🚧 Intake full - expired message {message_data['id']} dropped")
+            return
+        self.telegram_scraper.attach_trading_signal(message_data)
+        if self.store:
+            self.store.record_signal(message_data)
         
-        while self.is_running:
-            try:
-                # Get message from queue (with timeout)
-                message_data = await asyncio.wait_for(
-                    self.message_queue.get(), 
-                    timeout=5.0
-                )
-                
-                # Process the message
-                await self.process_single_message(message_data)
-                
-                # Mark task as done
-                self.message_queue.task_done()
-                
-            except asyncio.TimeoutError:
-                # No messages in queue, continue
-                continue
-            except Exception as e:
-                self.logger.error(f"❌ Error processing message queue: {e}")
-                await asyncio.sleep(1)
+        action = self.load_shedder.action_for(message_data)
+        if action == DOWNGRADE:
+            message_data['formatted_message'] = self.ai_processor.render_parser_only(message_data)
+            if self.store and message_data['formatted_message']:
+                self.store.record_ai_output(message_data, message_data['formatted_message'], 'parser_only')
+            if not message_data['formatted_message'] or not self.pipeline.inject('notify', message_data):
+                action = DROP
+        self.load_shedder.record(OVERFLOW, action, message_data)
+        self.logger.warning(f"🚧 Intake full - message {message_data['id']} {action}")
     
-    async def process_single_message(self, message_data: Dict[str, Any]):
-        """Process a single message through Forex AI and send trading notification"""
-        try:
-            message_id = message_data.get('id', 'unknown')
-            is_trading = message_data.get('is_trading_message', False)
-            
+    async def download_stage(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Pipeline stage: fetch chart images"""
+        await self.telegram_scraper.download_message_media(message_data)
+        if self.store:
+            self.store.record_media_path(message_data)
+        
+        # Byte-identical chart re-uploaded under a new media id: skip before AI
+        if await self.telegram_scraper.check_duplicate_media(message_data):
+            return None
+        return message_data
+    
+    async def parse_stage(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Pipeline stage: attach the parsed trading signal"""
+        self.telegram_scraper.attach_trading_signal(message_data)
+        if self.store:
+            self.store.record_signal(message_data)
+        
+        # Log with trading context
+        if message_data.get('is_trading_message', False):
+            signal_info = message_data.get('trading_signal')
+            self.logger.debug(f"📊 Trading signal queued: {signal_info.instrument or 'Unknown'} "
+                              f"({int(signal_info.confidence * 100)}% confidence) - ID: {message_data['id']}")
+        return message_data
+    
+    async def ai_stage(self, message_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Pipeline stage: format the notification through Forex AI"""
+        message_id = message_data.get('id', 'unknown')
+        
+        # Too old for Gemini: parser-only alert for parsed signals, drop the rest
+        shed_action = self.load_shedder.check_stale(message_data)
+        if shed_action == DROP:
+            self.logger.info(f"⌛ Stale message {message_id} dropped")
+            return None
+        if shed_action == DOWNGRADE:
+            self.logger.info(f"⌛ Stale message {message_id} sent with parser-only formatting")
+            message_data['formatted_message'] = self.ai_processor.render_parser_only(message_data)
+            if not message_data['formatted_message']:
+                return None
+            if self.store:
+                self.store.record_ai_output(message_data, message_data['formatted_message'], 'parser_only')
+            return message_data
+        
+        if message_data.get('is_trading_message', False):
+            self.logger.info(f"📊 Processing TRADING message {message_id}...")
+        else:
+            self.logger.info(f"🔄 Processing message {message_id}...")
+        
+        # Determine processing type
+        if message_data.get('has_media') and message_data.get('media_type') in ['photo', 'image']:
+            # Process chart image with forex analysis
+            formatted_message = await self.ai_processor.process_image_message(message_data)
+            output_kind = 'image'
+            # The in-memory chart is not needed past this stage
+            message_data.pop('_media_bytes', None)
+            analysis_key = 'chart_analysis'
+        else:
+            # Process text message with forex signal extraction
+            formatted_message = await self.ai_processor.process_text_message(message_data)
+            output_kind = 'text'
+            analysis_key = 'text_analysis'
+        
+        message_data['formatted_message'] = formatted_message
+        if self.store:
+            # Structured replies: keep the JSON and the merged signal (replaces the parse-stage row)
+            if message_data.get(analysis_key):
+                self.store.record_ai_output(message_data, message_data[analysis_key], analysis_key)
+                self.store.record_signal(message_data)
+            self.store.record_ai_output(message_data, formatted_message, output_kind)
+        return message_data
+    
+    async def notify_stage(self, message_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Pipeline stage: send the trading notification"""
+        message_id = message_data.get('id', 'unknown')
+        is_trading = message_data.get('is_trading_message', False)
+        
+        if self.load_shedder.check_expired(message_data):
+            self.logger.warning(f"⌛ Message {message_id} expired before notification, dropped")
+            return None
+        
+        # Send notification (enhanced for trading)
+        notification_sent = await self.notifier.send_notification(message_data['formatted_message'], message_data)
+        if self.store:
+            self.store.record_notification(message_data, notification_sent, type(self.notifier).__name__)
+        
+        if notification_sent:
+            self.processed_messages += 1
             if is_trading:
-                self.logger.info(f"📊 Processing TRADING message {message_id}...")
-            else:
-                self.logger.info(f"🔄 Processing message {message_id}...")
-            
-            # Determine processing type
-            if message_data.get('has_media') and message_data.get('media_type') in ['photo', 'image']:
-                # Process chart image with forex analysis
-                formatted_message = await self.ai_processor.process_image_message(message_data)
+                self.trading_signals_processed += 1
+                signal_info = message_data.get('trading_signal')
+                instrument = (signal_info and signal_info.instrument) or 'Unknown'
+                confidence = int(signal_info.confidence * 100) if signal_info else 0
+                self.logger.info(f"✅ TRADING SIGNAL {message_id} processed: {instrument} ({confidence}% confidence)")
             else:
-                # Process text message with forex signal extraction
-                formatted_message = await self.ai_processor.process_text_message(message_data)
-            
-            # Send notification (enhanced for trading)
-            notification_sent = await self.notifier.send_notification(formatted_message, message_data)
-            
-            if notification_sent:
-                self.processed_messages += 1
-                if is_trading:
-                    self.trading_signals_processed += 1
-                    signal_info = message_data.get('trading_signal', {})
-                    instrument = signal_info.get('instrument', 'Unknown')
-                    confidence = int(signal_info.get('confidence', 0) * 100)
-                    self.logger.info(f"✅ TRADING SIGNAL {message_id} processed: {instrument} ({confidence}% confidence)")
-                else:
-                    self.logger.info(f"✅ Message {message_id} processed and notification sent")
-            else:
-                self.logger.error(f"❌ Failed to send notification for message {message_id}")
-                
-                # Try to send urgent alert about failure
-                if hasattr(self.notifier, 'send_urgent_alert'):
-                    await self.notifier.send_urgent_alert(
-                        "Trading Notification Failed",
-                        f"Failed to send trading alert for message from {message_data.get('chat_title', 'Unknown')}"
-                    )
+                self.logger.info(f"✅ Message {message_id} processed and notification sent")
+        else:
+            self.logger.error(f"❌ Failed to send notification for message {message_id}")
             
-        except Exception as e:
-            self.logger.error(f"❌ Error processing message: {e}")
-            self.logger.debug(traceback.format_exc())
+            # Try to send urgent alert about failure
+            if hasattr(self.notifier, 'send_urgent_alert'):
+                await self.notifier.send_urgent_alert(
+                    "Trading Notification Failed",
+                    f"Failed to send trading alert for message from {message_data.get('chat_title', 'Unknown')}"
+                )
+        
+        return message_data
     
     async def start_monitoring(self):
         """Start monitoring all configured platforms for forex signals"""
@@ -253,13 +404,24 @@ class ForexMessageScraperApp:
         self.logger.log_startup(config_summary)
         
         try:
+            # Parsing and media download run as pipeline stages instead of in the Telethon handler
+            self.telegram_scraper.inline_processing = False
+            if self.store:
+                await self.store.open()
+            self.pipeline.start()
+            
             # Start all monitoring tasks
             tasks = [
                 asyncio.create_task(self.telegram_scraper.start_monitoring(), name="telegram_forex_monitor"),
-                asyncio.create_task(self.process_message_queue(), name="forex_message_processor"),
                 asyncio.create_task(self.forex_status_reporter(), name="forex_status_reporter")
             ]
             
+            if self.journal:
+                pending_messages = self.journal.open()
+                self.journal.start()
+                if pending_messages:
+                    tasks.append(asyncio.create_task(self._replay_journal(pending_messages), name="journal_replay"))
+            
             self.logger.info("🎯 Forex message scraper is now monitoring for trading signals...")
             self.logger.info("📊 Ready to analyze charts and extract trading signals")
             self.logger.info("🛑 Press Ctrl+C to stop monitoring")
@@ -289,6 +451,74 @@ class ForexMessageScraperApp:
                                    f"{self.trading_signals_processed} trading signals processed, "
                                    f"uptime: {uptime}")
                 
+                if self.telegram_scraper:
+                    filter_stats = self.telegram_scraper.get_filter_stats()
+                    self.logger.info(f"🧹 Filter: {filter_stats['passed']}/{filter_stats['checked']} passed, "
+                                   f"{filter_stats['dropped']} dropped "
+                                   f"(excluded {filter_stats['excluded']}, irrelevant {filter_stats['irrelevant']}), "
+                                   f"{filter_stats['duplicates']} duplicates skipped")
+                    media_stats = self.telegram_scraper.get_media_stats()
+                    self.logger.info(f"📎 Media: {media_stats['downloads']} downloaded, "
+                                   f"{media_stats['id_hits'] + media_stats['content_hits']} reused, "
+                                   f"{media_stats['wrong_type'] + media_stats['too_large']} skipped by policy, "
+                                   f"{media_stats['stored_bytes'] // (1024 * 1024)}MB stored "
+                                   f"({media_stats['evictions']} evicted)")
+                
+                stage_stats = self.pipeline.get_stats()
+                self.logger.info("🔀 Pipeline: " + ", ".join(
+                    f"{name} {stats['queued']} queued/{stats['in_flight']} active/{stats['processed']} done"
+                    for name, stats in stage_stats.items()))
+                shed = self.load_shedder.snapshot()
+                if shed['total']:
+                    self.logger.info(f"🚧 Shed {shed['total']} messages: " + ", ".join(
+                        f"{reason} {actions['dropped']} dropped/{actions['downgraded']} downgraded"
+                        for reason, actions in shed['by_reason'].items()))
+                for name, stats in stage_stats.items():
+                    if 'classes' in stats:
+                        self.logger.info(f"🎯 {name} priority: " + ", ".join(
+                            f"{cls} {cls_stats['queued']} queued (wait avg {cls_stats['wait_mean']}s, max {cls_stats['wait_max']}s)"
+                            for cls, cls_stats in stats['classes'].items()))
+                
+                if self.store:
+                    store_stats = self.store.snapshot()
+                    self.logger.info(f"🗄️ Store: {store_stats['written']} records in {store_stats['batches']} batches, "
+                                   f"{store_stats['backlog']} pending, {store_stats['dropped']} dropped")
+                
+                if self.ai_processor:
+                    budget = self.ai_processor.get_rate_limit_stats()
+                    self.logger.info(f"🚦 Gemini budget: {budget['requests_available']:.1f}/{budget['requests_per_minute']:.0f} req, "
+                                   f"{budget['tokens_available']}/{budget['tokens_per_minute']} tokens, "
+                                   f"{budget['rate_limited']} rate limited, backoff {budget['backoff_remaining']}s")
+                    cache = self.ai_processor.get_cache_stats()
+                    self.logger.info(f"💾 Gemini cache: {cache['hits']} hits ({cache['memory_hits']} memory, "
+                                   f"{cache['disk_hits']} disk), {cache['misses']} misses, "
+                                   f"hit rate {cache['hit_rate'] * 100:.0f}%")
+                    chart_cache = self.ai_processor.get_chart_cache_stats()
+                    if chart_cache['lookups']:
+                        self.logger.info(f"🖼️ Chart cache: {chart_cache['hits']}/{chart_cache['lookups']} charts reused "
+                                       f"({chart_cache['exact_hits']} identical), {chart_cache['entries']} stored")
+                    preprocessing = self.ai_processor.get_preprocessing_stats()
+                    if preprocessing['images']:
+                        self.logger.info(f"🗜️ Chart preprocessing: {preprocessing['images']} images, "
+                                       f"{preprocessing['bytes_saved'] // 1024}KB saved, "
+                                       f"decode avg {preprocessing['decode_ms_avg']}ms, "
+                                       f"total avg {preprocessing['total_ms_avg']}ms")
+                    circuit = self.ai_processor.get_circuit_stats()
+                    if circuit['opened'] or circuit['state'] != 'closed':
+                        self.logger.info(f"🔌 Gemini circuit {circuit['state']}: opened {circuit['opened']}x, "
+                                       f"{circuit['rejected']} calls skipped, {circuit['probes']} probes"
+                                       + (f", next probe in {circuit['retry_in']}s" if circuit['retry_in'] else ""))
+                    for kind, routing in self.ai_processor.get_routing_stats().items():
+                        self.logger.info(f"🔀 {kind} models: {routing['hedges']} hedged ({routing['hedge_wins']} won by "
+                                       f"the duplicate), {routing['failovers']} failovers; " + ", ".join(
+                                           f"{name} p95 {stats['p95']}s err {stats['error_rate'] * 100:.0f}%"
+                                           for name, stats in routing['models'].items()))
+                    batching = self.ai_processor.get_batching_stats()
+                    if batching and batching['batches']:
+                        self.logger.info(f"📦 Text batching: {batching['items']} messages in {batching['batches']} requests "
+                                       f"(avg {batching['avg_batch_size']}), {batching['missed']} retried singly, "
+                                       f"{batching['singles']} sent alone")
+                
             except Exception as e:
                 self.logger.error(f"❌ Forex status reporter error: {e}")
     
@@ -306,17 +536,24 @@ class ForexMessageScraperApp:
                 self.logger.info("📱 Stopping Telegram forex monitoring...")
                 await self.telegram_scraper.stop_monitoring()
             
-            # Process remaining messages in queue (with timeout)
-            if not self.message_queue.empty():
-                queue_size = self.message_queue.qsize()
-                self.logger.info(f"📤 Processing {queue_size} remaining trading messages...")
+            # Let the pipeline finish remaining messages (with timeout)
+            pending = self.pipeline.pending()
+            if pending:
+                self.logger.info(f"📤 Processing {pending} remaining trading messages...")
                 
-                # Process with timeout to avoid hanging
-                timeout_seconds = min(queue_size * 2, 30)  # Max 30 seconds
-                try:
-                    await asyncio.wait_for(self._process_remaining_messages(), timeout=timeout_seconds)
-                except asyncio.TimeoutError:
+                # Process with timeout to avoid hanging; the journal replays the rest on next start
+                timeout_seconds = min(pending * 2, self.shutdown_drain)
+                if not await self.pipeline.drain(timeout=timeout_seconds):
                     self.logger.warning("⏰ Timeout processing remaining messages, proceeding with shutdown")
+            await self.pipeline.stop()
+            
+            if self.journal:
+                await self.journal.close()
+                if self.journal.pending:
+                    self.logger.info(f"📒 {self.journal.pending} unprocessed messages kept in journal for next start")
+            
+            if self.store:
+                await self.store.close()
             
             # Send shutdown notification with trading stats
             if self.notifier and hasattr(self.notifier, 'send_urgent_alert'):
@@ -336,24 +573,15 @@ class ForexMessageScraperApp:
                 except Exception as e:
                     self.logger.error(f"❌ Error sending shutdown notification: {e}")
             
+            if self.ai_processor:
+                self.ai_processor.close()
+            
             self.logger.log_shutdown()
             self.logger.info(f"✅ Forex cleanup completed. Trading signals processed: {self.trading_signals_processed}")
             
         except Exception as e:
             self.logger.error(f"❌ Cleanup error: {e}")
     
-    async def _process_remaining_messages(self):
-        """Process remaining messages in queue"""
-        while not self.message_queue.empty():
-            try:
-                message_data = self.message_queue.get_nowait()
-                await self.process_single_message(message_data)
-                self.message_queue.task_done()
-            except asyncio.QueueEmpty:
-                break
-            except Exception as e:
-                self.logger.error(f"❌ Error processing remaining message: {e}")
-
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown"""
         def signal_handler(signum, frame):
@@ -402,16 +630,17 @@ async def test_components():
     # Test Trading Signal Parser
     print("\n4. Testing Trading Signal Parser...")
     try:
-        from utils.trading_signal_parser import extract_quick_signal, is_trading_message
+        from utils.trading_signal_praser import TradingSignalParser
         
         # Test with sample forex message
+        parser = TradingSignalParser(config.get('forex_filters', {}))
         test_message = "XAUUSD SELL at 2650.50, SL: 2665.00, TP: 2620.00"
-        signal = extract_quick_signal(test_message)
-        is_forex = is_trading_message(test_message)
+        signal = parser.extract_trading_signal(test_message)
+        is_forex = parser.is_forex_related(test_message)
         
-        if signal['is_valid_signal'] and is_forex:
+        if signal.is_valid_signal and is_forex:
             print("✅ Trading Signal Parser working")
-            print(f"   Sample: {signal['instrument']} {signal['direction']} - Confidence: {int(signal['confidence']*100)}%")
+            print(f"   Sample: {signal.instrument} {signal.direction} - Confidence: {int(signal.confidence*100)}%")
         else:
             print("❌ Trading Signal Parser failed")
             return False
@@ -505,14 +734,15 @@ async def send_test_notification():
         # Create sample trading signal data
         test_trading_data = {
             'is_trading_message': True,
-            'trading_signal': {
-                'instrument': 'XAUUSD',
-                'direction': 'SELL',
-                'entry_price': 2650.50,
-                'stop_loss': 2665.00,
-                'take_profit': [2620.00],
-                'confidence': 0.85
-            },
+            'trading_signal': TradingSignal(
+                instrument='XAUUSD',
+                direction='SELL',
+                entry_price=2650.50,
+                stop_loss=2665.00,
+                take_profit=(2620.00,),
+                confidence=0.85,
+                is_valid_signal=True
+            ),
             'signal_confidence': 0.85
         }
         
@@ -0,0 +1,80 @@
+from typing import Dict, Any, Optional, Callable
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.pipeline.priority_queue import PRIORITY_CLASSES, message_age_seconds
+
+# Shed actions
+DROP = 'dropped'
+DOWNGRADE = 'downgraded'   # parser-only rendering instead of Gemini
+
+# Shed reasons
+OVERFLOW = 'overflow'      # intake queue full
+STALE = 'stale'            # older than the class max age before AI processing
+EXPIRED = 'expired'        # too old to notify at all
+
+DEFAULT_MAX_AGE = {'urgent': 120, 'signal': 180, 'chart': 300, 'other': 120}
+
+
+class LoadShedder:
+    """Decides when a message is shed (dropped or downgraded) and counts every decision"""
+    
+    def __init__(self, classify: Callable[[Dict[str, Any]], int], max_age: Optional[Dict[str, float]] = None,
+                 stale_action: str = DOWNGRADE, notify_max_age: float = 900, enabled: bool = True):
+        self.classify = classify
+        self.max_age = dict(DEFAULT_MAX_AGE, **(max_age or {}))
+        self.stale_action = DROP if stale_action in ('drop', DROP) else DOWNGRADE
+        self.notify_max_age = notify_max_age
+        self.enabled = enabled
+        
+        self.stats = {reason: {DROP: 0, DOWNGRADE: 0} for reason in (OVERFLOW, STALE, EXPIRED)}
+        self.class_stats = {name: 0 for name in PRIORITY_CLASSES}
+    
+    def action_for(self, message_data: Dict[str, Any]) -> str:
+        """Only messages with a valid parsed signal can be rendered without Gemini"""
+        signal = message_data.get('trading_signal')
+        if self.stale_action == DOWNGRADE and signal is not None and signal.is_valid_signal:
+            return DOWNGRADE
+        return DROP
+    
+    def record(self, reason: str, action: str, message_data: Dict[str, Any]) -> str:
+        """Count a shed decision and tag the message with its reason"""
+        self.stats[reason][action] += 1
+        self.class_stats[PRIORITY_CLASSES[self.classify(message_data)]] += 1
+        message_data['shed_reason'] = reason
+        return action
+    
+    def check_stale(self, message_data: Dict[str, Any]) -> Optional[str]:
+        """Before AI: None if fresh enough, else the shed action"""
+        if not self.enabled:
+            return None
+        limit = self.max_age.get(PRIORITY_CLASSES[self.classify(message_data)])
+        if not limit or message_age_seconds(message_data) <= limit:
+            return None
+        return self.record(STALE, self.action_for(message_data), message_data)
+    
+    def check_expired(self, message_data: Dict[str, Any]) -> bool:
+        """Before notify: True if the alert is too old to be worth sending"""
+        if not self.enabled or not self.notify_max_age:
+            return False
+        if message_age_seconds(message_data) <= self.notify_max_age:
+            return False
+        self.record(EXPIRED, DROP, message_data)
+        return True
+    
+    @property
+    def shed_total(self) -> int:
+        return sum(sum(actions.values()) for actions in self.stats.values())
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Shed counters by reason/action and by priority class"""
+        return {
+            'total': self.shed_total,
+            'by_reason': {reason: dict(actions) for reason, actions in self.stats.items()},
+            'by_class': dict(self.class_stats)
+        }
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+
+# message_data key holding the journal offset of a queued message
+JOURNAL_OFFSET_KEY = '_journal_offset'
+
+# Derived values rebuilt by the pipeline on replay (the parse stage re-attaches the signal)
+DERIVED_KEYS = ('trading_signal', 'formatted_message', 'chart_analysis')
+
+ADD = 'add'
+ACK = 'ack'
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _json_object_hook(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    return value
+
+
+def encode_message(message_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Durable part of message_data (no transient handles or derived values)"""
+    record = {}
+    for key, value in message_data.items():
+        if key.startswith('_') or key in DERIVED_KEYS:
+            continue
+        if isinstance(value, (str, int, float, bool, datetime, type(None))):
+            record[key] = value
+    return record
+
+
+class MessageJournal:
+    """Append-only, fsync-batched journal of queued messages with acknowledgement offsets"""
+    
+    def __init__(self, path: str = "data/pending_messages.journal", flush_interval: float = 0.2,
+                 max_batch: int = 100, compact_bytes: int = 1048576):
+        self.path = path
+        # A crash loses at most the last flush_interval of newly queued messages
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.compact_bytes = compact_bytes
+        
+        self._next_offset = 0
+        self._pending: Dict[int, str] = {}   # offset -> journal line of unacknowledged messages
+        self._buffer: List[str] = []
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._file = None
+        self._closing = False
+        
+        self.stats = {'appended': 0, 'acked': 0, 'replayed': 0, 'flushes': 0, 'compactions': 0}
+    
+    def open(self) -> List[Dict[str, Any]]:
+        """Load the journal, compact it and return unacknowledged messages for replay"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        if os.path.exists(self.path):
+            self._load()
+        self._compact()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        
+        replay = []
+        for offset, line in sorted(self._pending.items()):
+            message_data = json.loads(line, object_hook=_json_object_hook)['data']
+            message_data[JOURNAL_OFFSET_KEY] = offset
+            replay.append(message_data)
+        self.stats['replayed'] = len(replay)
+        if replay:
+            logger.info(f"📒 Journal: replaying {len(replay)} unprocessed messages")
+        return replay
+    
+    def _load(self):
+        """Rebuild the pending set; a torn last line from a crash is ignored"""
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("⚠️ Journal: skipping corrupt record")
+                    continue
+                offset = record.get('offset', -1)
+                if record.get('op') == ADD:
+                    self._pending[offset] = line
+                elif record.get('op') == ACK:
+                    self._pending.pop(offset, None)
+                self._next_offset = max(self._next_offset, offset + 1)
+    
+    def _compact(self):
+        """Rewrite the journal with only pending messages (atomic replace)"""
+        # May run in the flusher thread while the loop appends/acks - work on a copy
+        pending = self._pending.copy()
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for offset in sorted(pending):
+                file.write(pending[offset] + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self.stats['compactions'] += 1
+    
+    def start(self):
+        """Start the background flusher"""
+        self._flush_event = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop(), name="message_journal_flusher")
+    
+    def append(self, message_data: Dict[str, Any]) -> int:
+        """Journal a newly queued message; returns its offset (also stored in message_data)"""
+        offset = self._next_offset
+        self._next_offset += 1
+        line = json.dumps({'op': ADD, 'offset': offset, 'data': encode_message(message_data)},
+                          default=_json_default, ensure_ascii=False)
+        self._pending[offset] = line
+        self._buffer.append(line)
+        message_data[JOURNAL_OFFSET_KEY] = offset
+        self.stats['appended'] += 1
+        self._wake()
+        return offset
+    
+    def ack(self, message_data: Dict[str, Any]):
+        """Mark a message as fully processed (notified, dropped or failed)"""
+        offset = message_data.get(JOURNAL_OFFSET_KEY)
+        if offset is None or self._pending.pop(offset, None) is None:
+            return
+        self._buffer.append(json.dumps({'op': ACK, 'offset': offset}))
+        self.stats['acked'] += 1
+        self._wake()
+    
+    def _wake(self):
+        if self._flush_event is not None and len(self._buffer) >= self.max_batch:
+            self._flush_event.set()
+    
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._closing:
+                try:
+                    await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._flush_event.clear()
+            if not self._buffer:
+                if self._closing:
+                    return
+                continue
+            
+            lines, self._buffer = self._buffer, []
+            try:
+                # One write + fsync per batch, off the event loop
+                await loop.run_in_executor(None, self._write, lines)
+            except Exception as e:
+                logger.error(f"❌ Journal write failed: {e}")
+                if self._closing:
+                    return
+                self._buffer = lines + self._buffer
+                await asyncio.sleep(1)
+    
+    def _write(self, lines: List[str]):
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.stats['flushes'] += 1
+        
+        # Acked records only grow the file; rewrite it once it gets large
+        if self.compact_bytes and self._file.tell() > self.compact_bytes:
+            self._file.close()
+            self._compact()
+            self._file = open(self.path, 'a', encoding='utf-8')
+    
+    async def close(self):
+        """Let the flusher write out everything still buffered, then close the file"""
+        if self._flusher:
+            # Not cancelled: a cancelled await would leave its executor write running
+            self._closing = True
+            self._flush_event.set()
+            await self._flusher
+            self._flusher = None
+        if self._file:
+            if self._buffer:
+                lines, self._buffer = self._buffer, []
+                self._write(lines)
+            self._file.close()
+            self._file = None
+    
+    @property
+    def pending(self) -> int:
+        """Messages journaled but not yet acknowledged"""
+        return len(self._pending)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, pending=self.pending, buffered=len(self._buffer))
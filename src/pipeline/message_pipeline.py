@@ -0,0 +1,240 @@
+import asyncio
+import time
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Hashable
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+
+# Stage handler: returns the (possibly updated) item to forward, or None to drop it
+StageHandler = Callable[[Any], Awaitable[Optional[Any]]]
+
+
+class PipelineJob:
+    """Item travelling through the pipeline with its ordering key and sequence number"""
+    __slots__ = ('payload', 'key', 'seq', 'created')
+    
+    def __init__(self, payload: Any, key: Hashable, seq: int):
+        self.payload = payload
+        self.key = key
+        self.seq = seq
+        self.created = time.monotonic()
+
+
+class ChatSequencer:
+    """Releases jobs of the same key (chat) in intake order"""
+    
+    def __init__(self):
+        self._next_seq: Dict[Hashable, int] = {}
+        self._next_release: Dict[Hashable, int] = {}
+        self._held: Dict[Hashable, Dict[int, Optional[PipelineJob]]] = {}
+    
+    def assign(self, key: Hashable) -> int:
+        seq = self._next_seq.get(key, 0)
+        self._next_seq[key] = seq + 1
+        return seq
+    
+    def complete(self, key: Hashable, seq: int, job: Optional[PipelineJob]) -> List[PipelineJob]:
+        """Record a finished (or dropped, job=None) sequence number; return jobs now in order"""
+        held = self._held.setdefault(key, {})
+        held[seq] = job
+        
+        released = []
+        next_release = self._next_release.get(key, 0)
+        while next_release in held:
+            ready = held.pop(next_release)
+            if ready is not None:
+                released.append(ready)
+            next_release += 1
+        self._next_release[key] = next_release
+        
+        if not held:
+            del self._held[key]
+        return released
+    
+    @property
+    def held(self) -> int:
+        """Jobs finished early and waiting for an earlier job of the same chat"""
+        return sum(1 for jobs in self._held.values() for job in jobs.values() if job is not None)
+
+
+class PipelineStage:
+    """Pool of workers consuming one bounded queue"""
+    
+    def __init__(self, name: str, handler: StageHandler, workers: int = 1, queue_size: int = 100,
+                 ordered: bool = False, queue: Optional[asyncio.Queue] = None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(int(workers), 1)
+        self.queue: asyncio.Queue = queue if queue is not None else asyncio.Queue(maxsize=queue_size)
+        self.ordered = ordered
+        self._key_locks: Dict[Hashable, asyncio.Lock] = {}
+        
+        self.in_flight = 0
+        self.stats = {'processed': 0, 'dropped': 0, 'failed': 0}
+    
+    def key_lock(self, key: Hashable) -> asyncio.Lock:
+        """Per-chat lock; asyncio.Lock wakes waiters FIFO so jobs of a chat run in queue order"""
+        lock = self._key_locks.get(key)
+        if lock is None:
+            lock = self._key_locks[key] = asyncio.Lock()
+        return lock
+    
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = dict(self.stats, queued=self.queue.qsize(), in_flight=self.in_flight, workers=self.workers)
+        if hasattr(self.queue, 'class_snapshot'):
+            snapshot['classes'] = self.queue.class_snapshot()
+        return snapshot
+
+
+class MessagePipeline:
+    """Chain of concurrent stages connected by bounded queues"""
+    
+    def __init__(self, key_func: Callable[[Any], Hashable] = lambda item: None,
+                 on_complete: Optional[Callable[[Any], None]] = None):
+        # on_complete is called once per item when it leaves the pipeline (done, dropped or failed)
+        self.key_func = key_func
+        self.on_complete = on_complete
+        self.stages: List[PipelineStage] = []
+        self.sequencer = ChatSequencer()
+        self._ordered_index: Optional[int] = None
+        self._tasks: List[asyncio.Task] = []
+    
+    def add_stage(self, name: str, handler: StageHandler, workers: int = 1, queue_size: int = 100,
+                  ordered: bool = False, queue: Optional[asyncio.Queue] = None) -> PipelineStage:
+        """Append a stage; an ordered stage receives jobs of one chat in intake order"""
+        if ordered:
+            if self._ordered_index is not None:
+                raise ValueError("Only one ordered stage is supported")
+            self._ordered_index = len(self.stages)
+        stage = PipelineStage(name, handler, workers, queue_size, ordered, queue)
+        self.stages.append(stage)
+        return stage
+    
+    async def submit(self, item: Any):
+        """Put a new item into the first stage (waits while that queue is full)"""
+        if not self.stages:
+            raise RuntimeError("Pipeline has no stages")
+        key = self.key_func(item)
+        job = PipelineJob(item, key, self.sequencer.assign(key))
+        if self._ordered_index == 0:
+            for ready in self.sequencer.complete(key, job.seq, job):
+                await self.stages[0].queue.put(ready)
+        else:
+            await self.stages[0].queue.put(job)
+    
+    def try_submit(self, item: Any) -> bool:
+        """Put a new item into the first stage without waiting; False if the intake is full"""
+        if not self.stages:
+            raise RuntimeError("Pipeline has no stages")
+        intake = self.stages[0].queue
+        if intake.full():
+            return False
+        key = self.key_func(item)
+        job = PipelineJob(item, key, self.sequencer.assign(key))
+        if self._ordered_index == 0:
+            for ready in self.sequencer.complete(key, job.seq, job):
+                intake.put_nowait(ready)
+        else:
+            intake.put_nowait(job)
+        return True
+    
+    def inject(self, stage_name: str, item: Any) -> bool:
+        """Put an item straight into a later stage, outside chat ordering; False if that queue is full"""
+        for stage in self.stages:
+            if stage.name == stage_name:
+                try:
+                    stage.queue.put_nowait(PipelineJob(item, self.key_func(item), -1))
+                    return True
+                except asyncio.QueueFull:
+                    return False
+        raise KeyError(stage_name)
+    
+    def start(self):
+        """Spawn the worker tasks of every stage"""
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                self._tasks.append(asyncio.create_task(self._worker(index), name=f"pipeline_{stage.name}_{worker}"))
+        logger.info("🔀 Pipeline started: " + " → ".join(f"{stage.name}×{stage.workers}" for stage in self.stages))
+    
+    async def _worker(self, index: int):
+        stage = self.stages[index]
+        while True:
+            job = await stage.queue.get()
+            stage.in_flight += 1
+            result = None
+            try:
+                if stage.ordered:
+                    async with stage.key_lock(job.key):
+                        result = await stage.handler(job.payload)
+                else:
+                    result = await stage.handler(job.payload)
+                stage.stats['processed' if result is not None else 'dropped'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stage.stats['failed'] += 1
+                logger.error(f"❌ Pipeline stage {stage.name} error: {e}")
+            finally:
+                stage.queue.task_done()
+            
+            # Still counted as in flight while waiting for room in the next queue
+            await self._forward(index, job, result)
+            stage.in_flight -= 1
+    
+    async def _forward(self, index: int, job: PipelineJob, result: Optional[Any]):
+        """Hand a stage result to the next stage, re-ordering before the ordered stage"""
+        next_index = index + 1
+        if result is not None:
+            job.payload = result
+        
+        if result is None or next_index >= len(self.stages):
+            self._complete(job)
+        if next_index >= len(self.stages):
+            return
+        
+        if self._ordered_index == next_index:
+            # Dropped jobs still release their sequence number so later ones are not held back
+            for ready in self.sequencer.complete(job.key, job.seq, job if result is not None else None):
+                await self.stages[next_index].queue.put(ready)
+        elif result is not None:
+            await self.stages[next_index].queue.put(job)
+        elif self._ordered_index is not None and next_index < self._ordered_index:
+            self.sequencer.complete(job.key, job.seq, None)
+    
+    def _complete(self, job: PipelineJob):
+        if self.on_complete is None:
+            return
+        try:
+            self.on_complete(job.payload)
+        except Exception as e:
+            logger.error(f"❌ Pipeline completion callback error: {e}")
+    
+    def pending(self) -> int:
+        """Jobs queued, in flight or held for ordering"""
+        return sum(stage.queue.qsize() + stage.in_flight for stage in self.stages) + self.sequencer.held
+    
+    async def drain(self, timeout: float = 30.0) -> bool:
+        """Wait until every stage is idle; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.1)
+        return True
+    
+    async def stop(self):
+        """Cancel all workers"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage queue depth, in-flight count and counters"""
+        return {stage.name: stage.snapshot() for stage in self.stages}
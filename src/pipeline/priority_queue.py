@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# Priority classes, most valuable first
+URGENT = 0    # complete high-confidence signal on a subscribed instrument
+SIGNAL = 1    # any other valid trading signal
+CHART = 2     # chart image awaiting vision analysis
+OTHER = 3     # trading chatter that passed the filter
+PRIORITY_CLASSES = ('urgent', 'signal', 'chart', 'other')
+
+
+def message_age_seconds(message_data: Dict[str, Any]) -> float:
+    """Seconds since the message was posted (0 if unknown)"""
+    timestamp = message_data.get('timestamp')
+    if not isinstance(timestamp, datetime):
+        return 0.0
+    now = datetime.now(timezone.utc) if timestamp.tzinfo else datetime.now()
+    return max((now - timestamp).total_seconds(), 0.0)
+
+
+class _ClassBuckets:
+    """FIFO per priority class; len() is what asyncio.Queue uses for qsize/empty/full"""
+    __slots__ = ('deques', 'size')
+    
+    def __init__(self, count: int):
+        self.deques: List[deque] = [deque() for _ in range(count)]
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+
+
+class PriorityMessageQueue(asyncio.Queue):
+    """Bounded asyncio queue that serves priority classes first, with aging against starvation"""
+    
+    def __init__(self, maxsize: int = 0, classify: Callable[[Any], int] = lambda item: OTHER,
+                 aging_seconds: float = 15.0, classes: Tuple[str, ...] = PRIORITY_CLASSES):
+        # A head item of class N competes with class N-1 after waiting aging_seconds
+        self.classify = classify
+        self.aging_seconds = aging_seconds
+        self.classes = classes
+        self.class_stats = [{'enqueued': 0, 'dequeued': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+                            for _ in classes]
+        super().__init__(maxsize)
+    
+    def _init(self, maxsize):
+        self._queue = _ClassBuckets(len(self.classes))
+    
+    def _put(self, item):
+        rank = min(max(int(self.classify(getattr(item, 'payload', item))), 0), len(self.classes) - 1)
+        self._queue.deques[rank].append((time.monotonic(), item))
+        self._queue.size += 1
+        self.class_stats[rank]['enqueued'] += 1
+    
+    def _get(self):
+        now = time.monotonic()
+        best_rank, best_score = None, None
+        for rank, bucket in enumerate(self._queue.deques):
+            if not bucket:
+                continue
+            # Lower score wins; waiting time lifts an item towards the higher classes
+            score = rank * self.aging_seconds - (now - bucket[0][0])
+            if best_score is None or score < best_score:
+                best_rank, best_score = rank, score
+        
+        enqueued, item = self._queue.deques[best_rank].popleft()
+        self._queue.size -= 1
+        
+        wait = now - enqueued
+        stats = self.class_stats[best_rank]
+        stats['dequeued'] += 1
+        stats['wait_total'] += wait
+        stats['wait_max'] = max(stats['wait_max'], wait)
+        return item
+    
+    def class_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, oldest wait and dequeue wait times per priority class"""
+        now = time.monotonic()
+        snapshot = {}
+        for rank, name in enumerate(self.classes):
+            bucket = self._queue.deques[rank]
+            stats = self.class_stats[rank]
+            snapshot[name] = {
+                'queued': len(bucket),
+                'oldest_wait': round(now - bucket[0][0], 2) if bucket else 0.0,
+                'dequeued': stats['dequeued'],
+                'wait_mean': round(stats['wait_total'] / stats['dequeued'], 3) if stats['dequeued'] else 0.0,
+                'wait_max': round(stats['wait_max'], 3)
+            }
+        return snapshot
+
+
+class SignalPriorityClassifier:
+    """Map message_data to a priority class from signal validity, confidence, subscription and age"""
+    
+    def __init__(self, is_monitored: Callable[[Optional[str]], bool], high_confidence: float = 0.8,
+                 fresh_seconds: float = 60.0, subscriptions_configured: bool = True):
+        self.is_monitored = is_monitored
+        self.high_confidence = high_confidence
+        self.fresh_seconds = fresh_seconds
+        self.subscriptions_configured = subscriptions_configured
+    
+    def __call__(self, message_data: Dict[str, Any]) -> int:
+        rank = self.base_class(message_data)
+        
+        # Messages that were already old when they reached us are worth less
+        if self.fresh_seconds and message_age_seconds(message_data) > self.fresh_seconds:
+            rank = min(rank + 1, OTHER)
+        return rank
+    
+    def base_class(self, message_data: Dict[str, Any]) -> int:
+        """Priority class from the message content alone (no age demotion)"""
+        signal = message_data.get('trading_signal')
+        if message_data.get('is_trading_message') and signal is not None:
+            subscribed = not self.subscriptions_configured or self.is_monitored(signal.instrument)
+            rank = URGENT if subscribed and signal.confidence >= self.high_confidence else SIGNAL
+        elif message_data.get('has_media') and message_data.get('media_type') in ('photo', 'image'):
+            rank = CHART
+        else:
+            rank = OTHER
+        return rank
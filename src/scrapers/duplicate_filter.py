@@ -0,0 +1,131 @@
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+# Duplicate kinds
+SAME_MESSAGE = 'same_message'   # Telegram re-delivered a message we already have
+FORWARD = 'forward'             # forward (or original) of a message already seen in another chat
+CONTENT = 'content'             # same normalized text / media reposted
+MEDIA_FILE = 'media_file'       # byte-identical file re-uploaded under a new media id
+
+NON_WORD_RE = re.compile(r'[^\w.]+')
+URL_RE = re.compile(r'https?://\S+|t\.me/\S+', re.IGNORECASE)
+
+
+def normalize_text(text: str) -> str:
+    """Case/whitespace/punctuation-insensitive form of a message (links and emoji removed)"""
+    text = URL_RE.sub(' ', text or '').casefold()
+    return NON_WORD_RE.sub(' ', text).replace('_', ' ').strip()
+
+
+def file_digest(path: str, chunk_size: int = 65536) -> Optional[str]:
+    """SHA-256 of a file's bytes (None if it can't be read)"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class TTLSeenSet:
+    """Bounded set of recently seen keys; entries expire after ttl seconds"""
+    
+    def __init__(self, ttl: float = 3600, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._expiry: 'OrderedDict[str, float]' = OrderedDict()   # insertion order == expiry order
+    
+    def __contains__(self, key: str) -> bool:
+        expiry = self._expiry.get(key)
+        return expiry is not None and expiry > time.monotonic()
+    
+    def __len__(self) -> int:
+        return len(self._expiry)
+    
+    def add(self, key: str):
+        now = time.monotonic()
+        self._expiry.pop(key, None)
+        self._expiry[key] = now + self.ttl
+        
+        # Expired entries sit at the front; the size cap evicts the oldest live ones too
+        while self._expiry:
+            oldest_key, oldest_expiry = next(iter(self._expiry.items()))
+            if oldest_expiry > now and len(self._expiry) <= self.max_entries:
+                break
+            self._expiry.popitem(last=False)
+
+
+class DuplicateFilter:
+    """Idempotency layer: drops re-deliveries, cross-chat forwards and reposted content"""
+    
+    def __init__(self, settings: Dict[str, Any]):
+        self.enabled = settings.get('enabled', True)
+        # Short texts ("TP1 hit") legitimately repeat; only longer ones are content-deduplicated
+        self.min_text_length = settings.get('min_text_length', 20)
+        self.seen = TTLSeenSet(ttl=settings.get('ttl_seconds', 3600),
+                               max_entries=settings.get('max_entries', 10000))
+        
+        self.stats = {'checked': 0, SAME_MESSAGE: 0, FORWARD: 0, CONTENT: 0, MEDIA_FILE: 0}
+    
+    def message_keys(self, message_data: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Idempotency keys known before download, by duplicate kind"""
+        chat_id, message_id = message_data.get('chat_id'), message_data.get('id')
+        keys = {SAME_MESSAGE: [f"msg:{chat_id}:{message_id}"], FORWARD: [], CONTENT: []}
+        
+        # An original and its forwards share the origin key, whichever chat we see first
+        origin = message_data.get('forward_origin')
+        keys[FORWARD].append(f"origin:{origin}" if origin else f"origin:{chat_id}:{message_id}")
+        
+        text = normalize_text(message_data.get('text', ''))
+        media_id = message_data.get('media_id')
+        if media_id or len(text) >= self.min_text_length:
+            keys[CONTENT].append("content:" + self._hash(text, media_id))
+        return keys
+    
+    def check(self, message_data: Dict[str, Any]) -> Optional[str]:
+        """Before download: None for new messages (now marked seen), else the duplicate kind"""
+        if not self.enabled:
+            return None
+        self.stats['checked'] += 1
+        keys = self.message_keys(message_data)
+        return self._check_keys(keys)
+    
+    def check_media(self, message_data: Dict[str, Any], digest: Optional[str]) -> Optional[str]:
+        """After download, before AI: catch byte-identical files uploaded as new media"""
+        if not self.enabled or not digest:
+            return None
+        text = normalize_text(message_data.get('text', ''))
+        return self._check_keys({MEDIA_FILE: ["file:" + self._hash(text, digest)]})
+    
+    def _check_keys(self, keys: Dict[str, List[str]]) -> Optional[str]:
+        duplicate = next((kind for kind, kind_keys in keys.items()
+                          if any(key in self.seen for key in kind_keys)), None)
+        
+        # Refresh every key so a chain of reposts stays recognised
+        for kind_keys in keys.values():
+            for key in kind_keys:
+                self.seen.add(key)
+        if duplicate:
+            self.stats[duplicate] += 1
+        return duplicate
+    
+    @staticmethod
+    def _hash(text: str, media: Any) -> str:
+        return hashlib.sha1(f"{text}\x00{media or ''}".encode('utf-8')).hexdigest()
+    
+    @property
+    def duplicates(self) -> int:
+        """Total messages skipped as duplicates"""
+        return self.stats[SAME_MESSAGE] + self.stats[FORWARD] + self.stats[CONTENT] + self.stats[MEDIA_FILE]
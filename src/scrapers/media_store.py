@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import json
+import os
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+from src.scrapers.duplicate_filter import file_digest
+
+# Download policy decisions
+ALLOWED = 'allowed'
+WRONG_TYPE = 'wrong_type'
+TOO_LARGE = 'too_large'
+
+
+class MediaStore:
+    """Content-addressed media files (objects/<sha256>.<ext>) with a Telegram file-id index and LRU quota"""
+    
+    def __init__(self, root: str = "media/store", quota_bytes: int = 500 * 1024 * 1024,
+                 max_file_bytes: int = 10 * 1024 * 1024, allowed_mime_types: Optional[List[str]] = None):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.max_file_bytes = max_file_bytes
+        # Prefixes ("image/") or exact types ("image/png")
+        self.allowed_mime_types = tuple(allowed_mime_types or ['image/'])
+        
+        self.objects_dir = os.path.join(root, 'objects')
+        self.tmp_dir = os.path.join(root, 'tmp')
+        self.index_path = os.path.join(root, 'index.json')
+        
+        self._index: Dict[str, str] = {}                        # telegram file id -> object path
+        self._objects: 'OrderedDict[str, int]' = OrderedDict()  # object path -> size, least recently used first
+        self._save_lock = asyncio.Lock()
+        self._download_seq = itertools.count()
+        
+        self.stats = {'downloads': 0, 'id_hits': 0, 'content_hits': 0, WRONG_TYPE: 0, TOO_LARGE: 0,
+                      'evictions': 0, 'bytes_downloaded': 0}
+        self._load()
+    
+    def _load(self):
+        """Rebuild the LRU from the objects on disk and load the file-id index"""
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        
+        objects = []
+        for directory, _, files in os.walk(self.objects_dir):
+            for name in files:
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                objects.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(objects):
+            self._objects[path] = size
+        
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as file:
+                    index = json.load(file)
+                self._index = {file_id: path for file_id, path in index.items() if path in self._objects}
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Media store index unreadable, starting empty: {e}")
+    
+    def check_policy(self, mime_type: Optional[str], size: Optional[int]) -> str:
+        """Whether media of this type/size should be downloaded at all"""
+        if not mime_type or not mime_type.startswith(self.allowed_mime_types):
+            decision = WRONG_TYPE
+        elif self.max_file_bytes and size and size > self.max_file_bytes:
+            decision = TOO_LARGE
+        else:
+            return ALLOWED
+        self.stats[decision] += 1
+        return decision
+    
+    def lookup(self, file_id: Any) -> Optional[Tuple[str, str]]:
+        """(object path, sha256) stored for a Telegram file id (a forward / re-send of known media)"""
+        path = self._index.get(str(file_id))
+        if path is None or not os.path.exists(path):
+            return None
+        self._touch(path)
+        self.stats['id_hits'] += 1
+        return path, os.path.splitext(os.path.basename(path))[0]
+    
+    def temp_path(self, file_id: Any) -> str:
+        """Download target; the file is moved into objects/ by add()"""
+        return os.path.join(self.tmp_dir, f"{file_id}_{next(self._download_seq)}")
+    
+    async def add(self, file_id: Any, downloaded_path: str) -> Tuple[str, str]:
+        """Move a finished download into the store; returns (object path, sha256)"""
+        loop = asyncio.get_running_loop()
+        path, digest, size, is_new = await loop.run_in_executor(None, self._store_file, downloaded_path)
+        await self._register(file_id, path, size, is_new)
+        return path, digest
+    
+    async def add_bytes(self, file_id: Any, data: bytes, digest: str, extension: str) -> str:
+        """Persist media downloaded into memory; returns the object path"""
+        loop = asyncio.get_running_loop()
+        path, size, is_new = await loop.run_in_executor(None, self._store_bytes, data, digest, extension)
+        await self._register(file_id, path, size, is_new)
+        return path
+    
+    async def _register(self, file_id: Any, path: str, size: int, is_new: bool):
+        loop = asyncio.get_running_loop()
+        if is_new:
+            self._objects[path] = size
+            self.stats['downloads'] += 1
+            self.stats['bytes_downloaded'] += size
+            evicted = self._select_evictions(keep=path)
+            if evicted:
+                await loop.run_in_executor(None, self._remove_files, evicted)
+        else:
+            # Same bytes re-uploaded under a new file id
+            self.stats['content_hits'] += 1
+            self._touch(path)
+        
+        self._index[str(file_id)] = path
+        await self._save_index()
+    
+    def _object_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest + extension.lower())
+    
+    def _store_file(self, downloaded_path: str) -> Tuple[str, str, int, bool]:
+        digest = file_digest(downloaded_path)
+        path = self._object_path(digest, os.path.splitext(downloaded_path)[1])
+        directory = os.path.dirname(path)
+        
+        if os.path.exists(path):
+            os.remove(downloaded_path)
+            return path, digest, os.path.getsize(path), False
+        os.makedirs(directory, exist_ok=True)
+        os.replace(downloaded_path, path)
+        return path, digest, os.path.getsize(path), True
+    
+    def _store_bytes(self, data: bytes, digest: str, extension: str) -> Tuple[str, int, bool]:
+        path = self._object_path(digest, extension)
+        if os.path.exists(path):
+            return path, len(data), False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = os.path.join(self.tmp_dir, f"{digest}_{next(self._download_seq)}")
+        with open(temp_path, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+        return path, len(data), True
+    
+    def _touch(self, path: str):
+        if path in self._objects:
+            self._objects.move_to_end(path)
+        try:
+            os.utime(path)   # mtime is the LRU order after a restart
+        except OSError:
+            pass
+    
+    def _select_evictions(self, keep: str) -> List[str]:
+        """Drop least recently used objects from the LRU/index until the store fits its quota"""
+        evicted = []
+        total = sum(self._objects.values())
+        for path in list(self._objects):
+            if total <= self.quota_bytes:
+                break
+            if path == keep:
+                continue
+            total -= self._objects.pop(path)
+            evicted.append(path)
+        if evicted:
+            self.stats['evictions'] += len(evicted)
+            stale_ids = [file_id for file_id, path in self._index.items() if path not in self._objects]
+            for file_id in stale_ids:
+                del self._index[file_id]
+        return evicted
+    
+    @staticmethod
+    def _remove_files(paths: List[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    async def _save_index(self):
+        async with self._save_lock:
+            index = dict(self._index)
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._write_index, index)
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to save media store index: {e}")
+    
+    def _write_index(self, index: Dict[str, str]):
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(index, file)
+        os.replace(temp_path, self.index_path)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, objects=len(self._objects), stored_bytes=sum(self._objects.values()))
@@ -0,0 +1,79 @@
+import re
+from typing import Dict, List, Any, Optional, Tuple
+import os
+import sys
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.trading_signal_praser import TradingSignalParser
+
+# Filter decisions
+PASSED = 'passed'
+EXCLUDED = 'excluded'
+IRRELEVANT = 'irrelevant'
+
+
+def compile_keywords(keywords: List[str], whole_word: bool = True) -> Optional[re.Pattern]:
+    """Compile keywords into one case-insensitive alternation (None if empty)"""
+    keywords = [keyword for keyword in keywords if keyword]
+    if not keywords:
+        return None
+    # Longest first so "STOP LOSS" wins over "STOP"
+    alternation = '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))
+    # Required keywords may be followed by digits (TP1, SL2); excluded ones match word prefixes
+    suffix = r'(?![A-Za-z])' if whole_word else ''
+    return re.compile(r'(?<![A-Za-z0-9])(?:' + alternation + ')' + suffix, re.IGNORECASE)
+
+
+class ForexMessageFilter:
+    """Pre-AI filter applying forex_filters include/exclude rules and the signal parser"""
+    
+    def __init__(self, filters: Dict[str, Any], parser: TradingSignalParser):
+        self.enabled = filters.get('enabled', True)
+        self.parser = parser
+        self._required_re = compile_keywords(filters.get('required_keywords') or [])
+        self._exclude_re = compile_keywords(filters.get('exclude_keywords') or [], whole_word=False)
+        # Also keep messages the parser recognises (pairs, trading terms) that lack a required keyword
+        self.match_forex_related = filters.get('match_forex_related', False)
+        
+        self.stats = {'checked': 0, PASSED: 0, EXCLUDED: 0, IRRELEVANT: 0}
+    
+    def check(self, text: str, has_image: bool = False) -> Tuple[bool, str]:
+        """Decide whether a message should go on to download / AI; returns (keep, reason)"""
+        self.stats['checked'] += 1
+        decision = self._decide(text, has_image)
+        self.stats[decision] += 1
+        return decision == PASSED, decision
+    
+    def _decide(self, text: str, has_image: bool) -> str:
+        """Apply exclude rules, then image pass-through, then include rules"""
+        if not self.enabled:
+            return PASSED
+        
+        # Noise filtering always applies, even to captions of charts
+        if text and self._exclude_re and self._exclude_re.search(text):
+            return EXCLUDED
+        
+        # Charts are frequently posted without a caption
+        if has_image:
+            return PASSED
+        
+        if not text:
+            return IRRELEVANT
+        
+        if self._required_re and self._required_re.search(text):
+            return PASSED
+        
+        # Without required keywords the parser decides; with them, only if explicitly enabled
+        if (not self._required_re or self.match_forex_related) and self.parser.is_forex_related(text):
+            return PASSED
+        
+        return IRRELEVANT
+    
+    @property
+    def dropped(self) -> int:
+        """Total messages dropped by the filter"""
+        return self.stats[EXCLUDED] + self.stats[IRRELEVANT]
@@ -1,9 +1,9 @@
 import asyncio
-from telethon import TelegramClient, events
+import hashlib
+from telethon import TelegramClient, events, utils
 from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import os
-from datetime import datetime
 import sys
 
 # Add project root to path for imports
@@ -13,6 +13,10 @@ sys.path.insert(0, project_root)
 
 from src.utils.config import config
 from src.utils.logger import logger
+from src.utils.trading_signal_praser import TradingSignalParser
+from src.scrapers.message_filter import ForexMessageFilter
+from src.scrapers.duplicate_filter import DuplicateFilter, file_digest
+from src.scrapers.media_store import MediaStore, ALLOWED
 
 class TelegramScraper:
     def __init__(self):
@@ -23,6 +27,28 @@ class TelegramScraper:
         self.message_callback = None
         self.is_running = False
         
+        # Pre-AI filter stage (forex_filters include/exclude rules + signal parser)
+        forex_filters = config.get('forex_filters', {}) or {}
+        self.signal_parser = TradingSignalParser(forex_filters)
+        self.message_filter = ForexMessageFilter(forex_filters, self.signal_parser)
+        self.duplicate_filter = DuplicateFilter(self.config.get('dedup', {}) or {})
+        
+        # Only chart-sized images are downloaded; each distinct file is stored once
+        media_config = self.config.get('media', {}) or {}
+        self.media_store = MediaStore(
+            root=media_config.get('store_path', 'media/store'),
+            quota_bytes=int(media_config.get('quota_mb', 500) * 1024 * 1024),
+            max_file_bytes=int(media_config.get('max_file_mb', 10) * 1024 * 1024),
+            allowed_mime_types=media_config.get('allowed_mime_types', ['image/'])
+        )
+        # Download charts into memory for the vision call; write them to disk only when asked to
+        self.in_memory_media = media_config.get('in_memory', True)
+        self.save_chart_images = config.get('debug.save_chart_images', False)
+        self._persist_tasks = set()
+        
+        # When False, parsing and media download are left to the app's pipeline stages
+        self.inline_processing = True
+        
     async def initialize(self):
         """Initialize Telegram client"""
         try:
@@ -85,6 +111,14 @@ class TelegramScraper:
         """Process incoming message"""
         try:
             message = event.message
+            text = message.text or ''
+            media_type = self._get_media_type(message.media) if message.media else None
+            
+            # Drop chatter/spam before chat lookups, media download and AI
+            keep, reason = self.message_filter.check(text, has_image=media_type in ('photo', 'image'))
+            if not keep:
+                logger.debug(f"🧹 Message {message.id} from chat {event.chat_id} dropped by filter ({reason})")
+                return
             
             # Get chat info
             chat = await event.get_chat()
@@ -94,25 +128,33 @@ class TelegramScraper:
             message_data = {
                 'id': message.id,
                 'chat_id': chat.id,
+                'peer_id': event.chat_id,  # Marked id, resolvable when refetching the message
                 'chat_title': getattr(chat, 'title', getattr(chat, 'first_name', 'Unknown')),
                 'sender_id': sender.id if sender else None,
                 'sender_name': self._get_sender_name(sender),
                 'timestamp': message.date,
-                'text': message.text or '',
-                'media_type': None,
+                'text': text,
+                'media_type': media_type,
                 'media_path': None,
                 'has_media': bool(message.media),
-                'source': 'telegram'
+                'media_id': self._get_media_id(message),
+                'forward_origin': self._get_forward_origin(message),
+                'source': 'telegram',
+                # Transient handle for the download stage (removed once media is fetched)
+                '_telegram_message': message
             }
             
-            # Handle media messages
-            if message.media:
-                message_data['media_type'] = self._get_media_type(message.media)
-                
-                # Download media if it's an image
-                if isinstance(message.media, (MessageMediaPhoto, MessageMediaDocument)):
-                    media_path = await self._download_media(message, chat.id, message.id)
-                    message_data['media_path'] = media_path
+            # Forwards across target chats, reposts and re-deliveries cost no download / AI call
+            duplicate = self.duplicate_filter.check(message_data)
+            if duplicate:
+                logger.debug(f"♻️ Message {message.id} from chat {chat.id} skipped as duplicate ({duplicate})")
+                return
+            
+            if self.inline_processing:
+                self.attach_trading_signal(message_data)
+                await self.download_message_media(message_data)
+                if await self.check_duplicate_media(message_data):
+                    return
             
             # Log message receipt
             content_preview = message_data['text'] or f"[{message_data['media_type']}]"
@@ -129,6 +171,53 @@ class TelegramScraper:
         except Exception as e:
             logger.error(f"❌ Error processing Telegram message: {e}")
     
+    def attach_trading_signal(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach the parsed signal so later stages don't re-parse the text"""
+        text = message_data.get('text')
+        if text:
+            signal = self.signal_parser.extract_trading_signal(text)
+            message_data['trading_signal'] = signal
+            message_data['is_trading_message'] = signal.is_valid_signal
+            message_data['signal_confidence'] = signal.confidence
+        return message_data
+    
+    async def download_message_media(self, message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Download photo/document media of a scraped message into media_path"""
+        message = message_data.pop('_telegram_message', None)
+        
+        # Replayed from the journal: refetch the message to get its media handle
+        if message is None and message_data.get('has_media') and not message_data.get('media_path') and self.client:
+            try:
+                message = await self.client.get_messages(message_data.get('peer_id', message_data['chat_id']),
+                                                         ids=message_data['id'])
+            except Exception as e:
+                logger.error(f"❌ Failed to refetch message {message_data['id']} for media: {e}")
+        
+        if message is not None and isinstance(message.media, (MessageMediaPhoto, MessageMediaDocument)):
+            if self.in_memory_media:
+                await self._download_media_to_memory(message, message_data)
+            else:
+                message_data['media_path'], message_data['media_hash'] = await self._download_media(message)
+        return message_data
+    
+    async def check_duplicate_media(self, message_data: Dict[str, Any]) -> Optional[str]:
+        """After download: duplicate kind if the file is byte-identical to recently seen media"""
+        if not (message_data.get('media_hash') or message_data.get('media_path')) or not self.duplicate_filter.enabled:
+            return None
+        digest = message_data.get('media_hash')
+        if not digest:
+            loop = asyncio.get_running_loop()
+            digest = await loop.run_in_executor(None, file_digest, message_data['media_path'])
+        duplicate = self.duplicate_filter.check_media(message_data, digest)
+        if duplicate:
+            logger.debug(f"♻️ Message {message_data['id']} skipped: media already seen ({duplicate})")
+        return duplicate
+    
+    def get_filter_stats(self) -> Dict[str, int]:
+        """Counters of the pre-AI filter stage"""
+        return dict(self.message_filter.stats, dropped=self.message_filter.dropped,
+                    duplicates=self.duplicate_filter.duplicates)
+    
     def _get_sender_name(self, sender) -> str:
         """Get human-readable sender name"""
         if not sender:
@@ -146,6 +235,27 @@ class TelegramScraper:
         else:
             return f"User {sender.id}"
     
+    def _get_media_id(self, message) -> Optional[int]:
+        """Telegram file id of the photo/document (kept when media is forwarded or re-sent)"""
+        media = message.photo or message.document
+        return media.id if media is not None else None
+    
+    def _get_forward_origin(self, message) -> Optional[str]:
+        """"<chat id>:<message id>" of the original message for forwards"""
+        fwd = message.fwd_from
+        if not fwd:
+            return None
+        peer = fwd.from_id or fwd.saved_from_peer
+        peer_id = (getattr(peer, 'channel_id', None) or getattr(peer, 'chat_id', None)
+                   or getattr(peer, 'user_id', None) or fwd.from_name)
+        post_id = fwd.channel_post or fwd.saved_from_msg_id
+        if post_id is None:
+            # User forwards carry no message id; the original send time identifies them
+            post_id = f"@{int(fwd.date.timestamp())}" if fwd.date else None
+        if peer_id is None or post_id is None:
+            return None
+        return f"{peer_id}:{post_id}"
+    
     def _get_media_type(self, media) -> str:
         """Determine media type"""
         if isinstance(media, MessageMediaPhoto):
@@ -162,29 +272,89 @@ class TelegramScraper:
         else:
             return "other"
     
-    async def _download_media(self, message, chat_id: int, message_id: int) -> Optional[str]:
-        """Download media file"""
+    def _downloadable_media(self, message):
+        """Photo/document of a message if the download policy allows it"""
+        media = message.photo or message.document
+        if media is None:
+            return None
+        
+        # Videos, audio, documents and oversized files are never analyzed
+        decision = self.media_store.check_policy(message.file.mime_type, message.file.size)
+        if decision != ALLOWED:
+            logger.debug(f"⏭️ Media of message {message.id} not downloaded ({decision}: "
+                         f"{message.file.mime_type}, {message.file.size} bytes)")
+            return None
+        return media
+    
+    async def _download_media_to_memory(self, message, message_data: Dict[str, Any]):
+        """Download media into message_data['_media_bytes'], persisting it in the background if enabled"""
         try:
-            # Create media directory
-            media_dir = f"media/telegram/{chat_id}"
-            os.makedirs(media_dir, exist_ok=True)
+            media = self._downloadable_media(message)
+            if media is None:
+                return
+            
+            stored = self.media_store.lookup(media.id)
+            if stored:
+                message_data['media_path'], message_data['media_hash'] = stored
+                return
             
-            # Generate filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{message_id}_{timestamp}"
+            data = await self.client.download_media(message.media, file=bytes)
+            if not data:
+                return
+            loop = asyncio.get_running_loop()
+            digest = await loop.run_in_executor(None, lambda: hashlib.sha256(data).hexdigest())
+            message_data['_media_bytes'] = data
+            message_data['media_hash'] = digest
+            logger.debug(f"📥 Downloaded media into memory: {len(data)} bytes")
+            
+            if self.save_chart_images:
+                task = asyncio.create_task(self._persist_media(media.id, data, digest, utils.get_extension(message.media)))
+                self._persist_tasks.add(task)
+                task.add_done_callback(self._persist_tasks.discard)
+        
+        except Exception as e:
+            logger.error(f"❌ Failed to download media: {e}")
+    
+    async def _persist_media(self, file_id: int, data: bytes, digest: str, extension: str):
+        """Write in-memory media to the store off the alert path"""
+        try:
+            path = await self.media_store.add_bytes(file_id, data, digest, extension)
+            logger.debug(f"💾 Saved media: {path}")
+        except Exception as e:
+            logger.error(f"❌ Failed to save media: {e}")
+    
+    async def _download_media(self, message) -> Tuple[Optional[str], Optional[str]]:
+        """Download media into the content-addressed store; returns (path, sha256)"""
+        try:
+            media = self._downloadable_media(message)
+            if media is None:
+                return None, None
+            
+            # Forwards and re-sends keep the Telegram file id: reuse the stored copy
+            stored = self.media_store.lookup(media.id)
+            if stored:
+                logger.debug(f"📎 Reusing stored media: {stored[0]}")
+                return stored
             
             # Download file
             file_path = await self.client.download_media(
                 message.media,
-                file=f"{media_dir}/{filename}"
+                file=self.media_store.temp_path(media.id)
             )
+            if not file_path:
+                return None, None
             
-            logger.debug(f"📥 Downloaded media: {file_path}")
-            return file_path
+            stored = await self.media_store.add(media.id, file_path)
+            logger.debug(f"📥 Downloaded media: {stored[0]}")
+            return stored
             
         except Exception as e:
             logger.error(f"❌ Failed to download media: {e}")
-            return None
+            return None, None
+    
+    def get_media_stats(self) -> Dict[str, Any]:
+        """Media store downloads, reuse and quota counters"""
+        return self.media_store.snapshot()
     
     async def start_monitoring(self):
         """Start monitoring target chats"""
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Dict, List, Any, Optional, Tuple
+
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    source TEXT,
+    chat_title TEXT,
+    sender_id INTEGER,
+    sender_name TEXT,
+    text TEXT,
+    media_type TEXT,
+    media_path TEXT,
+    posted_at TEXT,
+    received_at TEXT NOT NULL,
+    UNIQUE (chat_id, message_id)
+);
+CREATE INDEX IF NOT EXISTS idx_messages_chat_posted ON messages (chat_id, posted_at);
+CREATE INDEX IF NOT EXISTS idx_messages_posted ON messages (posted_at);
+
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    instrument TEXT,
+    direction TEXT,
+    entry_price REAL,
+    stop_loss REAL,
+    take_profit TEXT,
+    risk_reward TEXT,
+    timeframe TEXT,
+    confidence REAL,
+    is_valid INTEGER,
+    posted_at TEXT,
+    created_at TEXT NOT NULL,
+    UNIQUE (chat_id, message_id)
+);
+CREATE INDEX IF NOT EXISTS idx_signals_instrument_posted ON signals (instrument, posted_at);
+
+CREATE TABLE IF NOT EXISTS ai_outputs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    kind TEXT,
+    output TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ai_outputs_message ON ai_outputs (chat_id, message_id);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    notifier TEXT,
+    success INTEGER,
+    shed_reason TEXT,
+    sent_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_message ON notifications (chat_id, message_id);
+"""
+
+INSERT_MESSAGE = """INSERT OR IGNORE INTO messages
+    (chat_id, message_id, source, chat_title, sender_id, sender_name, text, media_type, media_path,
+     posted_at, received_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+INSERT_SIGNAL = """INSERT OR REPLACE INTO signals
+    (chat_id, message_id, instrument, direction, entry_price, stop_loss, take_profit, risk_reward,
+     timeframe, confidence, is_valid, posted_at, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+INSERT_AI_OUTPUT = """INSERT INTO ai_outputs (chat_id, message_id, kind, output, created_at)
+    VALUES (?, ?, ?, ?, ?)"""
+INSERT_NOTIFICATION = """INSERT INTO notifications (chat_id, message_id, notifier, success, shed_reason, sent_at)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+UPDATE_MEDIA_PATH = "UPDATE messages SET media_path = ? WHERE chat_id = ? AND message_id = ?"
+
+
+def to_utc_iso(value: Optional[datetime]) -> Optional[str]:
+    """ISO-8601 UTC string (sortable) for datetimes; naive values are assumed UTC"""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class MessageStore:
+    """WAL-mode SQLite store fed by a background batching writer"""
+    
+    def __init__(self, path: str = "data/forex_messages.db", batch_size: int = 100,
+                 flush_interval: float = 0.5, max_pending: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        # One thread owns the connection, so reads and batched writes are serialized
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='message_store')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._writer: Optional[asyncio.Task] = None
+        
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'dropped': 0, 'errors': 0}
+    
+    async def open(self):
+        """Create the database / schema and start the writer task"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._connect)
+        self._writer = asyncio.create_task(self._write_loop(), name="message_store_writer")
+        logger.info(f"🗄️ Message store ready: {self.path}")
+    
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+    
+    # --- writes (never block the event loop) ---
+    
+    def _enqueue(self, sql: str, params: Tuple):
+        try:
+            self._queue.put_nowait((sql, params))
+            self.stats['queued'] += 1
+        except asyncio.QueueFull:
+            if not self.stats['dropped']:
+                logger.warning("⚠️ Message store backlog full - dropping records")
+            self.stats['dropped'] += 1
+    
+    def record_message(self, message_data: Dict[str, Any]):
+        """Persist the raw message (ignored if already stored)"""
+        self._enqueue(INSERT_MESSAGE, (
+            message_data.get('chat_id'), message_data.get('id'), message_data.get('source'),
+            message_data.get('chat_title'), message_data.get('sender_id'), message_data.get('sender_name'),
+            message_data.get('text'), message_data.get('media_type'), message_data.get('media_path'),
+            to_utc_iso(message_data.get('timestamp')), _now()
+        ))
+    
+    def record_media_path(self, message_data: Dict[str, Any]):
+        """Update the stored media path once the download stage has run"""
+        if message_data.get('media_path'):
+            self._enqueue(UPDATE_MEDIA_PATH, (message_data['media_path'], message_data.get('chat_id'),
+                                              message_data.get('id')))
+    
+    def record_signal(self, message_data: Dict[str, Any]):
+        """Persist the parsed trading signal of a message (replaces an earlier parse)"""
+        signal = message_data.get('trading_signal')
+        if signal is None:
+            return
+        self._enqueue(INSERT_SIGNAL, (
+            message_data.get('chat_id'), message_data.get('id'), signal.instrument, signal.direction,
+            signal.entry_price, signal.stop_loss, json.dumps(list(signal.take_profit)), signal.risk_reward,
+            signal.timeframe, signal.confidence, int(signal.is_valid_signal),
+            to_utc_iso(message_data.get('timestamp')), _now()
+        ))
+    
+    def record_ai_output(self, message_data: Dict[str, Any], output: Optional[str], kind: str):
+        """Persist the formatted notification text produced for a message"""
+        self._enqueue(INSERT_AI_OUTPUT, (message_data.get('chat_id'), message_data.get('id'), kind, output, _now()))
+    
+    def record_notification(self, message_data: Dict[str, Any], success: bool, notifier: str):
+        """Persist a notification attempt"""
+        self._enqueue(INSERT_NOTIFICATION, (message_data.get('chat_id'), message_data.get('id'), notifier,
+                                            int(success), message_data.get('shed_reason'), _now()))
+    
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            op = await self._queue.get()
+            if op is None:
+                return
+            batch = [op]
+            stop = False
+            
+            # Collect more records for up to flush_interval to amortize the commit
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    op = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if op is None:
+                    stop = True
+                    break
+                batch.append(op)
+            
+            try:
+                await loop.run_in_executor(self._executor, self._write_batch, batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Message store write failed ({len(batch)} records): {e}")
+            if stop:
+                return
+    
+    def _write_batch(self, batch: List[Tuple[str, Tuple]]):
+        """One transaction per batch, executemany per statement run"""
+        with self._conn:
+            for sql, ops in groupby(batch, key=lambda op: op[0]):
+                self._conn.executemany(sql, [params for _, params in ops])
+    
+    async def close(self):
+        """Flush pending records and close the database"""
+        if self._writer:
+            await self._queue.put(None)
+            await self._writer
+            self._writer = None
+        if self._conn:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+    
+    # --- indexed lookups ---
+    
+    async def _query(self, sql: str, params: Tuple) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(self._executor, lambda: self._conn.execute(sql, params).fetchall())
+        return [dict(row) for row in rows]
+    
+    async def messages_for_chat(self, chat_id: int, since: Optional[datetime] = None,
+                                limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent messages of a chat"""
+        return await self._query(
+            "SELECT * FROM messages WHERE chat_id = ? AND posted_at >= ? ORDER BY posted_at DESC LIMIT ?",
+            (chat_id, to_utc_iso(since) or '', limit))
+    
+    async def signals_for_instrument(self, instrument: str, since: Optional[datetime] = None,
+                                     limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent parsed signals of an instrument"""
+        return await self._query(
+            "SELECT * FROM signals WHERE instrument = ? AND posted_at >= ? ORDER BY posted_at DESC LIMIT ?",
+            (instrument.upper(), to_utc_iso(since) or '', limit))
+    
+    async def messages_between(self, start: datetime, end: datetime, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Messages posted in [start, end)"""
+        return await self._query(
+            "SELECT * FROM messages WHERE posted_at >= ? AND posted_at < ? ORDER BY posted_at LIMIT ?",
+            (to_utc_iso(start), to_utc_iso(end), limit))
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, backlog=self._queue.qsize())
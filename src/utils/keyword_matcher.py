@@ -0,0 +1,204 @@
+from collections import deque
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+# Built-in instrument list (used when forex_filters doesn't extend it)
+DEFAULT_FOREX_PAIRS = [
+    'EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'AUDUSD', 'USDCAD', 'NZDUSD',
+    'EURJPY', 'GBPJPY', 'EURGBP', 'EURAUD', 'EURCHF', 'GBPAUD', 'GBPCHF',
+    'AUDJPY', 'CADJPY', 'CHFJPY', 'AUDCAD', 'AUDCHF', 'CADCHF', 'NZDJPY',
+    'XAUUSD', 'XAGUSD', 'BTCUSD', 'ETHUSD', 'LTCUSD', 'ADAUSD'
+]
+
+# Broker / colloquial names mapped to the canonical instrument
+DEFAULT_INSTRUMENT_ALIASES = {
+    'GOLD': 'XAUUSD', 'XAU': 'XAUUSD',
+    'SILVER': 'XAGUSD', 'XAG': 'XAGUSD',
+    'BITCOIN': 'BTCUSD', 'BTC': 'BTCUSD',
+    'ETHEREUM': 'ETHUSD', 'ETH': 'ETHUSD',
+    'US30': 'US30', 'DJ30': 'US30', 'DOW JONES': 'US30',
+    'NAS100': 'NAS100', 'US100': 'NAS100', 'NASDAQ': 'NAS100',
+    'US500': 'SPX500', 'SPX500': 'SPX500',
+    'GER40': 'GER40', 'DAX': 'GER40'
+}
+
+# Broker symbol suffixes (XAUUSDm, EURUSD.pro, GBPUSD+)
+DEFAULT_SYMBOL_SUFFIXES = ['M', 'C', 'PRO', '.PRO', '+', '.R', '.A']
+
+# Keywords that mark a message as trading related
+DEFAULT_TRADING_KEYWORDS = [
+    'BUY', 'SELL', 'LONG', 'SHORT', 'ENTRY', 'EXIT', 'STOP', 'TARGET',
+    'PROFIT', 'LOSS', 'PIPS', 'TRADE', 'SIGNAL', 'ANALYSIS', 'CHART',
+    'SUPPORT', 'RESISTANCE', 'TREND', 'BREAKOUT', 'REVERSAL'
+]
+
+# Direction words: (direction, is_strong)
+DIRECTION_WORDS = {
+    'BUY': ('BUY', True), 'LONG': ('BUY', True), 'BULLISH': ('BUY', False), 'UP': ('BUY', False),
+    'SELL': ('SELL', True), 'SHORT': ('SELL', True), 'BEARISH': ('SELL', False), 'DOWN': ('SELL', False)
+}
+
+# Payload kinds
+INSTRUMENT = 'instrument'
+DIRECTION = 'direction'
+KEYWORD = 'keyword'
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton matching many keywords in one pass over the text"""
+    
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[Tuple[int, Any, bool]]] = [[]]
+        self._delta: List[Dict[str, int]] = []
+        self._built = False
+        self.pattern_count = 0
+    
+    def add(self, pattern: str, payload: Any, whole_word: bool = True):
+        """Add a pattern; whole_word=False only requires a word boundary at the start"""
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append((len(pattern), payload, whole_word))
+        self.pattern_count += 1
+        self._built = False
+    
+    def build(self):
+        """Compute failure links and flatten them into a DFA transition table"""
+        fail = [0] * len(self._goto)
+        delta: List[Dict[str, int]] = [dict(self._goto[0])]
+        delta.extend({} for _ in range(len(self._goto) - 1))
+        
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # Inherit the fallback transitions of the failure state, then override with own edges
+            transitions = dict(delta[fail[state]])
+            for char, child in self._goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[fail[child]]
+                transitions[char] = child
+                queue.append(child)
+            delta[state] = transitions
+        
+        self._delta = delta
+        self._built = True
+    
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Yield (start, end, payload) for every word-bounded match, ordered by end offset"""
+        if not self._built:
+            self.build()
+        
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            end = index + 1
+            for length, payload, whole_word in outputs[state]:
+                start = end - length
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if whole_word and end < len(text) and text[end].isalnum():
+                    continue
+                yield start, end, payload
+
+
+class ForexMatch:
+    """Instrument, direction words and keyword hits found in one matcher pass"""
+    __slots__ = ('instrument', 'instrument_start', 'is_monitored', 'directions', 'keywords')
+    
+    def __init__(self):
+        self.instrument = None
+        self.instrument_start = -1
+        self.is_monitored = False
+        self.directions = []
+        self.keywords = []
+
+
+class ForexKeywordMatcher:
+    """Instrument / direction / keyword matcher built from the forex_filters config"""
+    
+    def __init__(self, filters: Optional[Dict[str, Any]] = None):
+        filters = filters or {}
+        
+        self.monitored_pairs = [pair.upper() for pair in filters.get('monitored_pairs') or []]
+        self.instruments = list(dict.fromkeys(DEFAULT_FOREX_PAIRS + self.monitored_pairs))
+        
+        aliases = dict(DEFAULT_INSTRUMENT_ALIASES)
+        aliases.update({alias.upper(): target.upper()
+                        for alias, target in (filters.get('instrument_aliases') or {}).items()})
+        self.aliases = aliases
+        
+        self.suffixes = [suffix.upper() for suffix in filters.get('symbol_suffixes', DEFAULT_SYMBOL_SUFFIXES)]
+        self.keywords = [word.upper() for word in filters.get('trading_keywords') or DEFAULT_TRADING_KEYWORDS]
+        
+        self._monitored_set = frozenset(self.monitored_pairs)
+        self._matcher = KeywordMatcher()
+        self._populate()
+        self._matcher.build()
+    
+    def _populate(self):
+        """Register every instrument spelling, direction word and keyword"""
+        matcher = self._matcher
+        
+        for pair in self.instruments:
+            payload = (INSTRUMENT, pair)
+            matcher.add(pair, payload)
+            for suffix in self.suffixes:
+                matcher.add(pair + suffix, payload)
+            if len(pair) == 6 and pair.isalpha():
+                for separator in ('/', ' ', '-', ' / '):
+                    matcher.add(pair[:3] + separator + pair[3:], payload)
+        
+        for alias, target in self.aliases.items():
+            matcher.add(alias, (INSTRUMENT, target))
+        
+        for word, (direction, strong) in DIRECTION_WORDS.items():
+            matcher.add(word, (DIRECTION, direction, strong))
+        
+        # Keywords match word prefixes too (SIGNALS, TRADERS, TARGETS)
+        for word in self.keywords:
+            matcher.add(word, (KEYWORD, word), whole_word=False)
+    
+    def is_monitored(self, instrument: Optional[str]) -> bool:
+        """Check if the instrument is in forex_filters.monitored_pairs"""
+        return instrument in self._monitored_set
+    
+    def match(self, text: str) -> ForexMatch:
+        """Collect instrument, direction words and keyword hits from uppercased text"""
+        result = ForexMatch()
+        instrument_length = 0
+        
+        for start, end, payload in self._matcher.iter_matches(text):
+            kind = payload[0]
+            if kind == INSTRUMENT:
+                # Earliest instrument wins; on a tie prefer the longest spelling
+                if (result.instrument is None or start < result.instrument_start or
+                        (start == result.instrument_start and end - start > instrument_length)):
+                    result.instrument = payload[1]
+                    result.instrument_start = start
+                    instrument_length = end - start
+            elif kind == DIRECTION:
+                result.directions.append((start, payload[1], payload[2]))
+            else:
+                result.keywords.append(payload[1])
+        
+        result.is_monitored = result.instrument in self._monitored_set
+        return result
+    
+    def has_trading_content(self, text: str) -> bool:
+        """Stop at the first instrument or keyword hit in uppercased text"""
+        for _, _, payload in self._matcher.iter_matches(text):
+            if payload[0] != DIRECTION:
+                return True
+        return False
@@ -1,265 +1,434 @@
 import re
-from typing import Dict, List, Optional, Any
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any, Iterable, Tuple
 from datetime import datetime
+import os
+import sys
 
-class TradingSignalParser:
-    """Utility class to extract trading information from text messages"""
+# Add project root to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+
+from src.utils.keyword_matcher import ForexKeywordMatcher
+
+# NumPy is only needed for the columnar batch API
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Price numbers, optionally with thousands separators (e.g. 3,361.06)
+PRICE_PATTERN = r'\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?'
+
+# Single-pass lexer over the uppercased message. Alternation order matters:
+# labels and timeframes have to win over the generic NUM / WORD tokens.
+TOKEN_RE = re.compile(r"""
+      (?P<RR>\bR:R\b|\bRR\b|\bRISK\s*/?\s*REWARD\b|\bRATIO\b)
+    | (?P<SL>\b(?:STOP\s*LOSS|STOPLOSS|SL|STOP)(?![A-Z]))
+    | (?P<TP>\b(?:TAKE\s*PROFIT|TAKEPROFIT|TARGET|TGT|TP)(?:\s?\d(?![\d.,]))?(?![A-Z]))
+    | (?P<ENTRY>\b(?:ENTRY|ENTER|PRICE|AT)(?![A-Z])|@)
+    | (?P<TF>\b(?:\d+(?:MIN|M|HR|H|DAY|D|WEEK|W)|[MHDW]\d+)\b)
+    | (?P<NUM>""" + PRICE_PATTERN + r""")
+    | (?P<WORD>[A-Z]+)
+""", re.VERBOSE)
+
+# Trading direction words (strong words win over weak ones)
+STRONG_DIRECTION_WORDS = {'BUY': 'BUY', 'LONG': 'BUY', 'SELL': 'SELL', 'SHORT': 'SELL'}
+WEAK_DIRECTION_WORDS = {'BULLISH': 'BUY', 'UP': 'BUY', 'BEARISH': 'SELL', 'DOWN': 'SELL'}
+
+# Words allowed between a label and its price ("BUY NOW 1.0850", "ENTRY ZONE 2650")
+FILLER_WORDS = frozenset({
+    'NOW', 'FROM', 'NEAR', 'AROUND', 'ZONE', 'LEVEL', 'LIMIT', 'MARKET', 'CMP', 'IS', 'ABOVE', 'BELOW'
+})
+
+# Units that turn the preceding number into a distance, not a price level ("SL 30 PIPS")
+DISTANCE_UNITS = frozenset({'PIP', 'PIPS', 'POINT', 'POINTS'})
+
+# Separators continuing a take profit list ("TP 66,000 / 68,000")
+TP_LIST_SEPARATORS = ('/', ',', '&')
+
+# Unknown pairs written as AAA/BBB or AAA-BBB
+SEPARATED_PAIR_SEPARATORS = ('/', '-')
+
+SUPPORT_RE = re.compile(r'SUPPORT[:\s]*(' + PRICE_PATTERN + ')')
+RESISTANCE_RE = re.compile(r'RESISTANCE[:\s]*(' + PRICE_PATTERN + ')')
+
+
+# Pip size per instrument (default 0.0001 for regular FX pairs)
+PIP_SIZES = {
+    'XAUUSD': 0.1, 'XAGUSD': 0.01,
+    'BTCUSD': 1.0, 'ETHUSD': 1.0, 'LTCUSD': 0.01, 'ADAUSD': 0.0001,
+    'US30': 1.0, 'NAS100': 1.0, 'SPX500': 0.1, 'GER40': 1.0
+}
+DEFAULT_PIP_SIZE = 0.0001
+
+# Direction categories used by SignalBatch.direction_codes
+DIRECTION_CATEGORIES = (None, 'BUY', 'SELL')
+
+
+def get_pip_size(instrument: Optional[str]) -> float:
+    """Pip size for an instrument (JPY quoted pairs use 0.01)"""
+    if not instrument:
+        return DEFAULT_PIP_SIZE
+    if instrument in PIP_SIZES:
+        return PIP_SIZES[instrument]
+    if instrument.endswith('JPY'):
+        return 0.01
+    return DEFAULT_PIP_SIZE
+
+
+def parse_price(token: str) -> float:
+    """Convert a lexed price token (possibly with thousands separators) to float"""
+    return float(token.replace(',', ''))
+
+
+class _SignalScan:
+    """Fields collected from one lexer pass over a message"""
+    __slots__ = ('instrument', 'direction', 'entry_price', 'stop_loss', 'take_profit',
+                 'risk_reward', 'timeframe')
     
     def __init__(self):
-        # Forex pairs patterns
-        self.forex_pairs = [
-            'EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'AUDUSD', 'USDCAD', 'NZDUSD',
-            'EURJPY', 'GBPJPY', 'EURGBP', 'EURAUD', 'EURCHF', 'GBPAUD', 'GBPCHF',
-            'AUDJPY', 'CADJPY', 'CHFJPY', 'AUDCAD', 'AUDCHF', 'CADCHF', 'NZDJPY',
-            'XAUUSD', 'XAGUSD', 'BTCUSD', 'ETHUSD', 'LTCUSD', 'ADAUSD'
-        ]
-        
-        # Trading direction patterns
-        self.direction_patterns = {
-            'buy': r'(?:BUY|LONG|BULLISH|UP)',
-            'sell': r'(?:SELL|SHORT|BEARISH|DOWN)'
-        }
-        
-        # Price patterns
-        self.price_pattern = r'\d+\.?\d*'
-        
-        # Trading keywords
-        self.trading_keywords = {
-            'entry': r'(?:ENTRY|ENTER|PRICE|@|AT)',
-            'stop_loss': r'(?:SL|STOP\s*LOSS|STOPLOSS|STOP)',
-            'take_profit': r'(?:TP|TAKE\s*PROFIT|TAKEPROFIT|TARGET|TGT)',
-            'risk_reward': r'(?:RR|RISK\s*REWARD|R:R|RATIO)'
-        }
+        self.instrument = None
+        self.direction = None
+        self.entry_price = None
+        self.stop_loss = None
+        self.take_profit = []
+        self.risk_reward = None
+        self.timeframe = None
     
-    def extract_trading_signal(self, text: str) -> Dict[str, Any]:
-        """Extract comprehensive trading signal from text"""
-        text_upper = text.upper()
-        
-        signal = {
-            'instrument': self._extract_instrument(text_upper),
-            'direction': self._extract_direction(text_upper),
-            'entry_price': self._extract_entry_price(text_upper),
-            'stop_loss': self._extract_stop_loss(text_upper),
-            'take_profit': self._extract_take_profit(text_upper),
-            'risk_reward': self._calculate_risk_reward(text_upper),
-            'timeframe': self._extract_timeframe(text_upper),
-            'confidence': self._calculate_confidence(text_upper),
-            'raw_prices': self._extract_all_prices(text),
-            'is_valid_signal': False
+    @property
+    def confidence(self) -> float:
+        """20% per populated signal field"""
+        score = 0.0
+        for value in (self.instrument, self.direction, self.entry_price, self.stop_loss, self.take_profit):
+            if value:
+                score += 0.2
+        return score
+
+
+@dataclass(frozen=True, slots=True)
+class TradingSignal:
+    """Immutable parse result for one message"""
+    instrument: Optional[str] = None
+    direction: Optional[str] = None
+    entry_price: Optional[float] = None
+    stop_loss: Optional[float] = None
+    take_profit: Tuple[float, ...] = ()
+    risk_reward: Optional[str] = None
+    timeframe: Optional[str] = None
+    confidence: float = 0.0
+    is_valid_signal: bool = False
+    source_text: str = field(default='', repr=False, compare=False)
+    _raw_prices: Optional[Tuple[float, ...]] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def raw_prices(self) -> Tuple[float, ...]:
+        """All price-like numbers in the source text (lexed on first access)"""
+        if self._raw_prices is None:
+            prices = []
+            for match in TOKEN_RE.finditer(self.source_text.upper()):
+                if match.lastgroup == 'NUM':
+                    price = parse_price(match.group())
+                    # Filter reasonable forex prices (avoid dates, percentages, etc.)
+                    if 0.01 <= price <= 100000:
+                        prices.append(price)
+            object.__setattr__(self, '_raw_prices', tuple(prices))
+        return self._raw_prices
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for notification / storage payloads"""
+        return {
+            'instrument': self.instrument,
+            'direction': self.direction,
+            'entry_price': self.entry_price,
+            'stop_loss': self.stop_loss,
+            'take_profit': list(self.take_profit),
+            'risk_reward': self.risk_reward,
+            'timeframe': self.timeframe,
+            'confidence': self.confidence,
+            'is_valid_signal': self.is_valid_signal
         }
-        
-        # Validate if this is a complete trading signal
-        signal['is_valid_signal'] = self._validate_signal(signal)
-        
-        return signal
+
+
+class SignalBatch:
+    """Columnar parse result for many messages (one NumPy array per field)"""
+    __slots__ = ('entry_price', 'stop_loss', 'take_profit', 'confidence', 'is_valid',
+                 'instrument_codes', 'instruments', 'direction_codes', 'risk_reward',
+                 'stop_pips', 'target_pips')
     
-    def _extract_instrument(self, text: str) -> Optional[str]:
-        """Extract currency pair or trading instrument"""
-        # Look for forex pairs
-        for pair in self.forex_pairs:
-            # Try with and without separator
-            patterns = [
-                pair,
-                pair[:3] + '/' + pair[3:],
-                pair[:3] + ' ' + pair[3:],
-                pair[:3] + '-' + pair[3:]
-            ]
-            
-            for pattern in patterns:
-                if pattern in text:
-                    return pair
-        
-        # Look for other patterns like EUR/USD, GBP/USD etc.
-        forex_pattern = r'([A-Z]{3})[\/\-\s]([A-Z]{3})'
-        match = re.search(forex_pattern, text)
-        if match:
-            return match.group(1) + match.group(2)
-        
-        return None
+    def __init__(self, entry_price, stop_loss, take_profit, confidence, instrument_codes,
+                 instruments: List[str], direction_codes):
+        self.entry_price = entry_price            # float64, NaN when missing
+        self.stop_loss = stop_loss                # float64, NaN when missing
+        self.take_profit = take_profit            # float64, first TP, NaN when missing
+        self.confidence = confidence              # float32
+        self.instrument_codes = instrument_codes  # int32 index into instruments, -1 when missing
+        self.instruments = instruments            # instrument categories
+        self.direction_codes = direction_codes    # int8 index into DIRECTION_CATEGORIES
+        
+        # Same rule as TradingSignalParser._validate_signal, over the whole batch
+        has_price = ((np.nan_to_num(entry_price) != 0) | (np.nan_to_num(stop_loss) != 0) |
+                     ~np.isnan(take_profit))
+        self.is_valid = ((instrument_codes >= 0) & (direction_codes > 0) & has_price &
+                         (confidence >= 0.4))
+        
+        # Risk/reward and pip distances (NaN wherever an input price is missing)
+        risk = np.abs(entry_price - stop_loss)
+        reward = np.abs(take_profit - entry_price)
+        self.risk_reward = np.divide(reward, risk, out=np.full_like(risk, np.nan), where=risk > 0)
+        
+        pip_table = np.array([get_pip_size(name) for name in instruments] + [DEFAULT_PIP_SIZE])
+        pip_sizes = pip_table[instrument_codes]  # code -1 picks DEFAULT_PIP_SIZE
+        self.stop_pips = risk / pip_sizes
+        self.target_pips = reward / pip_sizes
     
-    def _extract_direction(self, text: str) -> Optional[str]:
-        """Extract trading direction (BUY/SELL)"""
-        for direction, pattern in self.direction_patterns.items():
-            if re.search(pattern, text):
-                return direction.upper()
-        return None
+    def __len__(self) -> int:
+        return len(self.entry_price)
     
-    def _extract_entry_price(self, text: str) -> Optional[float]:
-        """Extract entry price"""
-        # Look for entry keywords followed by price
-        entry_pattern = f"{self.trading_keywords['entry']}[:\s]*({self.price_pattern})"
-        match = re.search(entry_pattern, text)
-        if match:
-            try:
-                return float(match.group(1))
-            except ValueError:
-                pass
-        
-        # If no specific entry keyword, try to find first price after direction
-        direction = self._extract_direction(text)
-        if direction:
-            # Look for price after direction word
-            direction_patterns = self.direction_patterns[direction.lower()]
-            pattern = f"{direction_patterns}[:\s@]*({self.price_pattern})"
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    return float(match.group(1))
-                except ValueError:
-                    pass
-        
-        return None
+    def instrument_at(self, index: int) -> Optional[str]:
+        """Instrument name for row index"""
+        code = self.instrument_codes[index]
+        return self.instruments[code] if code >= 0 else None
     
-    def _extract_stop_loss(self, text: str) -> Optional[float]:
-        """Extract stop loss price"""
-        sl_pattern = f"{self.trading_keywords['stop_loss']}[:\s]*({self.price_pattern})"
-        match = re.search(sl_pattern, text)
-        if match:
-            try:
-                return float(match.group(1))
-            except ValueError:
-                pass
-        return None
+    def direction_at(self, index: int) -> Optional[str]:
+        """Direction name for row index"""
+        return DIRECTION_CATEGORIES[self.direction_codes[index]]
+
+
+class TradingSignalParser:
+    """Utility class to extract trading information from text messages"""
     
-    def _extract_take_profit(self, text: str) -> List[float]:
-        """Extract take profit prices (can be multiple)"""
-        tp_pattern = f"{self.trading_keywords['take_profit']}[:\s]*({self.price_pattern})"
-        matches = re.findall(tp_pattern, text)
-        
-        take_profits = []
-        for match in matches:
-            try:
-                take_profits.append(float(match))
-            except ValueError:
-                continue
-        
-        return take_profits
+    def __init__(self, filters: Optional[Dict[str, Any]] = None):
+        # Instrument / direction / keyword automaton (forex_filters config section)
+        self.matcher = ForexKeywordMatcher(filters)
+        self.forex_pairs = self.matcher.instruments
+        # Instrument names may sit between a label and its price ("BUY LIMIT XAUUSD 3320")
+        self.instrument_words = frozenset(self.forex_pairs) | frozenset(self.matcher.aliases)
+        
+        # Price pattern
+        self.price_pattern = PRICE_PATTERN
     
-    def _extract_timeframe(self, text: str) -> Optional[str]:
-        """Extract chart timeframe"""
-        timeframe_patterns = [
-            r'(\d+)M(?:IN)?',  # 15M, 30MIN
-            r'(\d+)H(?:R)?',   # 1H, 4HR
-            r'(\d+)D(?:AY)?',  # 1D, 1DAY
-            r'(\d+)W(?:EEK)?', # 1W, 1WEEK
-            r'M(\d+)',         # M15, M30
-            r'H(\d+)',         # H1, H4
-            r'D(\d+)',         # D1
-        ]
-        
-        for pattern in timeframe_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(0)
-        
-        return None
+    def extract_trading_signal(self, text: str) -> TradingSignal:
+        """Extract comprehensive trading signal from text"""
+        scan = self._scan(text.upper())
+        confidence = scan.confidence
+        
+        return TradingSignal(
+            instrument=scan.instrument,
+            direction=scan.direction,
+            entry_price=scan.entry_price,
+            stop_loss=scan.stop_loss,
+            take_profit=tuple(scan.take_profit),
+            risk_reward=scan.risk_reward,
+            timeframe=scan.timeframe,
+            confidence=confidence,
+            # Validate if this is a complete trading signal
+            is_valid_signal=self._validate_signal(scan, confidence),
+            source_text=text
+        )
     
-    def _calculate_risk_reward(self, text: str) -> Optional[str]:
-        """Calculate or extract risk-reward ratio"""
-        # Look for explicit R:R ratio
-        rr_pattern = r'(?:RR|R:R|RATIO)[:\s]*(\d+\.?\d*)[:\s]*(\d+\.?\d*)'
-        match = re.search(rr_pattern, text)
-        if match:
-            return f"{match.group(1)}:{match.group(2)}"
-        
-        # Try to calculate from entry, SL, TP
-        entry = self._extract_entry_price(text)
-        stop_loss = self._extract_stop_loss(text)
-        take_profits = self._extract_take_profit(text)
-        
-        if entry and stop_loss and take_profits:
-            risk = abs(entry - stop_loss)
-            reward = abs(take_profits[0] - entry)
-            if risk > 0:
-                ratio = reward / risk
-                return f"1:{ratio:.1f}"
-        
-        return None
+    def parse_many(self, texts: Iterable[str]) -> SignalBatch:
+        """Parse many messages into a columnar SignalBatch without per-message dicts"""
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy is required for parse_many (pip install numpy)")
+        
+        nan = float('nan')
+        entries, stop_losses, take_profits = array('d'), array('d'), array('d')
+        confidences = array('f')
+        instrument_codes, direction_codes = array('i'), array('b')
+        categories: Dict[str, int] = {}
+        
+        for text in texts:
+            scan = self._scan(text.upper())
+            entries.append(nan if scan.entry_price is None else scan.entry_price)
+            stop_losses.append(nan if scan.stop_loss is None else scan.stop_loss)
+            take_profits.append(scan.take_profit[0] if scan.take_profit else nan)
+            confidences.append(scan.confidence)
+            if scan.instrument is None:
+                instrument_codes.append(-1)
+            else:
+                instrument_codes.append(categories.setdefault(scan.instrument, len(categories)))
+            direction_codes.append(DIRECTION_CATEGORIES.index(scan.direction))
+        
+        return SignalBatch(
+            entry_price=np.frombuffer(entries, dtype=np.float64),
+            stop_loss=np.frombuffer(stop_losses, dtype=np.float64),
+            take_profit=np.frombuffer(take_profits, dtype=np.float64),
+            confidence=np.frombuffer(confidences, dtype=np.float32),
+            instrument_codes=np.frombuffer(instrument_codes, dtype=np.int32),
+            instruments=list(categories),
+            direction_codes=np.frombuffer(direction_codes, dtype=np.int8)
+        )
     
-    def _extract_all_prices(self, text: str) -> List[float]:
-        """Extract all price-like numbers from text"""
-        price_matches = re.findall(self.price_pattern, text)
-        prices = []
-        
-        for match in price_matches:
-            try:
-                price = float(match)
-                # Filter reasonable forex prices (avoid dates, percentages, etc.)
-                if 0.01 <= price <= 100000:
-                    prices.append(price)
-            except ValueError:
+    def _scan(self, text: str) -> _SignalScan:
+        """Tokenize uppercased text once and fill every signal field from the token stream"""
+        scan = _SignalScan()
+        
+        pending = None          # label waiting for its price: ENTRY / SL / TP / RR / DIR
+        rr_first = None         # first number of an explicit R:R ratio
+        explicit_entry = None
+        weak_direction = None
+        direction_entry = None  # first price following a direction word
+        last_direction = None   # most recent strong direction word
+        entry_direction = None  # direction in force when the first entry price was read
+        separated_pair = None
+        prev_word = None        # (word, end offset) of the previous WORD token
+        last_price = None       # (label, end offset) of the price just assigned
+        
+        for match in TOKEN_RE.finditer(text):
+            kind = match.lastgroup
+            token = match.group()
+            
+            if kind == 'NUM':
+                price = parse_price(token)
+                if (pending is None and last_price is not None and last_price[0] == 'TP'
+                        and text[last_price[1]:match.start()].strip() in TP_LIST_SEPARATORS):
+                    pending = 'TP'
+                label = pending
+                if pending == 'ENTRY':
+                    if explicit_entry is None:
+                        explicit_entry = price
+                        if direction_entry is None:
+                            entry_direction = last_direction
+                elif pending == 'SL':
+                    if scan.stop_loss is None:
+                        scan.stop_loss = price
+                    else:
+                        label = None
+                elif pending == 'TP':
+                    scan.take_profit.append(price)
+                elif pending == 'DIR':
+                    if direction_entry is None:
+                        direction_entry = price
+                        if explicit_entry is None:
+                            entry_direction = last_direction
+                elif pending == 'RR':
+                    rr_first = token
+                    pending = 'RR2'
+                    continue
+                elif pending == 'RR2':
+                    if scan.risk_reward is None:
+                        scan.risk_reward = f"{rr_first}:{token}"
+                pending = None
+                last_price = (label, match.end())
                 continue
+            
+            # "SL 30 PIPS": the number was a distance, not the stop / target price
+            if kind == 'WORD' and token in DISTANCE_UNITS and last_price is not None:
+                if last_price[0] == 'SL':
+                    scan.stop_loss = None
+                elif last_price[0] == 'TP':
+                    scan.take_profit.pop()
+            last_price = None
+            
+            # A ratio label followed by a single number ("RR 3") means 1:3
+            if pending == 'RR2':
+                if scan.risk_reward is None:
+                    scan.risk_reward = f"1:{rr_first}"
+                pending = None
+            
+            if kind == 'WORD':
+                if separated_pair is None and len(token) == 3 and prev_word and len(prev_word[0]) == 3:
+                    if text[prev_word[1]:match.start()].strip() in SEPARATED_PAIR_SEPARATORS:
+                        separated_pair = prev_word[0] + token
+                prev_word = (token, match.end())
+                
+                direction = STRONG_DIRECTION_WORDS.get(token)
+                if direction:
+                    if scan.direction is None:
+                        scan.direction = direction
+                    last_direction = direction
+                    pending = 'DIR'
+                elif token in WEAK_DIRECTION_WORDS:
+                    if weak_direction is None:
+                        weak_direction = WEAK_DIRECTION_WORDS[token]
+                    pending = None
+                elif token not in FILLER_WORDS and token not in self.instrument_words:
+                    pending = None
+            elif kind == 'SL' and token == 'STOP' and pending == 'DIR':
+                # "SELL STOP 1.0800" is a pending order type, the price is its entry
+                continue
+            elif kind == 'ENTRY':
+                # "AT" / "@" after another label ("SL AT 1.0800") is just a filler
+                if token in ('AT', '@') and pending in ('SL', 'TP', 'DIR', 'ENTRY'):
+                    if pending == 'DIR':
+                        pending = 'ENTRY'
+                    continue
+                pending = 'ENTRY'
+            elif kind == 'TF':
+                if scan.timeframe is None:
+                    scan.timeframe = token
+            else:
+                pending = kind
         
-        return prices
-    
-    def _calculate_confidence(self, text: str) -> float:
-        """Calculate confidence score for signal validity"""
-        score = 0.0
-        
-        # Has instrument (+20%)
-        if self._extract_instrument(text):
-            score += 0.2
+        if pending == 'RR2' and scan.risk_reward is None:
+            scan.risk_reward = f"1:{rr_first}"
         
-        # Has direction (+20%)
-        if self._extract_direction(text):
-            score += 0.2
+        # Known instruments and broker aliases come from the keyword automaton
+        scan.instrument = self.matcher.match(text).instrument or separated_pair
         
-        # Has entry price (+20%)
-        if self._extract_entry_price(text):
-            score += 0.2
+        # "Closed my SELL ... Now BUY 1.0850": the direction attached to the entry is the signal
+        if entry_direction is not None:
+            scan.direction = entry_direction
+        elif scan.direction is None and weak_direction is not None:
+            scan.direction = weak_direction
         
-        # Has stop loss (+20%)
-        if self._extract_stop_loss(text):
-            score += 0.2
+        scan.entry_price = explicit_entry if explicit_entry is not None else direction_entry
         
-        # Has take profit (+20%)
-        if self._extract_take_profit(text):
-            score += 0.2
+        # Try to calculate risk/reward from entry, SL, TP
+        if scan.risk_reward is None and scan.entry_price and scan.stop_loss and scan.take_profit:
+            risk = abs(scan.entry_price - scan.stop_loss)
+            reward = abs(scan.take_profit[0] - scan.entry_price)
+            if risk > 0:
+                scan.risk_reward = f"1:{reward / risk:.1f}"
         
-        return score
+        return scan
+    
+    def is_monitored_instrument(self, instrument: Optional[str]) -> bool:
+        """Check if the instrument is one of forex_filters.monitored_pairs"""
+        return self.matcher.is_monitored(instrument)
     
-    def _validate_signal(self, signal: Dict[str, Any]) -> bool:
+    def _validate_signal(self, scan: _SignalScan, confidence: float) -> bool:
         """Validate if signal has minimum required information"""
-        required_fields = ['instrument', 'direction']
-        
         # Check required fields
-        for field in required_fields:
-            if not signal.get(field):
-                return False
+        if not scan.instrument or not scan.direction:
+            return False
         
         # Should have at least entry price OR stop loss OR take profit
-        price_fields = ['entry_price', 'stop_loss', 'take_profit']
-        has_price = any(signal.get(field) for field in price_fields)
+        has_price = bool(scan.entry_price or scan.stop_loss or scan.take_profit)
         
-        return has_price and signal.get('confidence', 0) >= 0.4
+        return has_price and confidence >= 0.4
     
-    def format_signal_summary(self, signal: Dict[str, Any]) -> str:
+    def format_signal_summary(self, signal: TradingSignal) -> str:
         """Format extracted signal into readable summary"""
-        if not signal['is_valid_signal']:
+        if not signal.is_valid_signal:
             return "❌ Invalid or incomplete trading signal"
         
-        summary = f"📈 **{signal['instrument']}** {signal['direction']}"
+        summary = f"📈 **{signal.instrument}** {signal.direction}"
         
-        if signal['entry_price']:
-            summary += f"\n💰 Entry: {signal['entry_price']}"
+        if signal.entry_price:
+            summary += f"\n💰 Entry: {signal.entry_price}"
         
-        if signal['stop_loss']:
-            summary += f"\n🛑 Stop Loss: {signal['stop_loss']}"
+        if signal.stop_loss:
+            summary += f"\n🛑 Stop Loss: {signal.stop_loss}"
         
-        if signal['take_profit']:
-            if len(signal['take_profit']) == 1:
-                summary += f"\n🎯 Take Profit: {signal['take_profit'][0]}"
+        if signal.take_profit:
+            if len(signal.take_profit) == 1:
+                summary += f"\n🎯 Take Profit: {signal.take_profit[0]}"
             else:
-                tp_list = ", ".join(map(str, signal['take_profit']))
+                tp_list = ", ".join(map(str, signal.take_profit))
                 summary += f"\n🎯 Take Profits: {tp_list}"
         
-        if signal['risk_reward']:
-            summary += f"\n📊 Risk/Reward: {signal['risk_reward']}"
+        if signal.risk_reward:
+            summary += f"\n📊 Risk/Reward: {signal.risk_reward}"
         
-        if signal['timeframe']:
-            summary += f"\n⏰ Timeframe: {signal['timeframe']}"
+        if signal.timeframe:
+            summary += f"\n⏰ Timeframe: {signal.timeframe}"
         
-        confidence_percent = int(signal['confidence'] * 100)
+        confidence_percent = int(signal.confidence * 100)
         summary += f"\n🎯 Confidence: {confidence_percent}%"
         
         return summary
@@ -273,25 +442,14 @@ class TradingSignalParser:
             'patterns': [],
             'indicators': []
         }
+        text_upper = text.upper()
         
         # Extract support/resistance levels
-        support_pattern = r'SUPPORT[:\s]*({self.price_pattern})'
-        resistance_pattern = r'RESISTANCE[:\s]*({self.price_pattern})'
+        for match in SUPPORT_RE.findall(text_upper):
+            annotations['support_levels'].append(parse_price(match))
         
-        support_matches = re.findall(support_pattern, text.upper())
-        resistance_matches = re.findall(resistance_pattern, text.upper())
-        
-        for match in support_matches:
-            try:
-                annotations['support_levels'].append(float(match))
-            except ValueError:
-                continue
-        
-        for match in resistance_matches:
-            try:
-                annotations['resistance_levels'].append(float(match))
-            except ValueError:
-                continue
+        for match in RESISTANCE_RE.findall(text_upper):
+            annotations['resistance_levels'].append(parse_price(match))
         
         # Extract common patterns
         pattern_keywords = [
@@ -300,7 +458,7 @@ class TradingSignalParser:
         ]
         
         for pattern in pattern_keywords:
-            if pattern in text.upper():
+            if pattern in text_upper:
                 annotations['patterns'].append(pattern)
         
         # Extract indicators
@@ -310,49 +468,45 @@ class TradingSignalParser:
         ]
         
         for indicator in indicator_keywords:
-            if indicator in text.upper():
+            if indicator in text_upper:
                 annotations['indicators'].append(indicator)
         
         return annotations
     
     def is_forex_related(self, text: str) -> bool:
         """Check if text contains forex/trading related content"""
-        text_upper = text.upper()
-        
-        # Check for forex pairs
-        if self._extract_instrument(text_upper):
-            return True
-        
-        # Check for trading keywords
-        trading_words = [
-            'BUY', 'SELL', 'LONG', 'SHORT', 'ENTRY', 'EXIT', 'STOP', 'TARGET',
-            'PROFIT', 'LOSS', 'PIPS', 'TRADE', 'SIGNAL', 'ANALYSIS', 'CHART',
-            'SUPPORT', 'RESISTANCE', 'TREND', 'BREAKOUT', 'REVERSAL'
-        ]
-        
-        for word in trading_words:
-            if word in text_upper:
-                return True
-        
-        return False
+        # Instruments and trading keywords in a single automaton pass
+        return self.matcher.has_trading_content(text.upper())
+
+# Shared parser for the helpers below (the parser itself is stateless)
+_default_parser = None
+
+def get_default_parser() -> TradingSignalParser:
+    """Return the shared module-level parser, creating it on first use"""
+    global _default_parser
+    if _default_parser is None:
+        _default_parser = TradingSignalParser()
+    return _default_parser
 
 # Utility functions for easy integration
-def extract_quick_signal(text: str) -> Dict[str, Any]:
+def extract_quick_signal(text: str) -> TradingSignal:
     """Quick signal extraction for immediate use"""
-    parser = TradingSignalParser()
-    return parser.extract_trading_signal(text)
+    return get_default_parser().extract_trading_signal(text)
+
+def parse_many(texts: Iterable[str]) -> SignalBatch:
+    """Quick columnar extraction for batches (backfills, analytics)"""
+    return get_default_parser().parse_many(texts)
 
 def is_trading_message(text: str) -> bool:
     """Quick check if message is trading-related"""
-    parser = TradingSignalParser()
-    return parser.is_forex_related(text)
+    return get_default_parser().is_forex_related(text)
 
 def format_trading_notification(text: str) -> str:
     """Quick format for trading notifications"""
-    parser = TradingSignalParser()
+    parser = get_default_parser()
     signal = parser.extract_trading_signal(text)
     
-    if signal['is_valid_signal']:
+    if signal.is_valid_signal:
         return parser.format_signal_summary(signal)
     else:
         return f"📊 Trading message detected:\n{text[:200]}..."
@@ -364,7 +518,8 @@ if __name__ == "__main__":
         "EURUSD BUY at 1.0850, SL: 1.0800, TP: 1.0950",
         "XAUUSD SELL 2650.50, Stop Loss 2665.00, Take Profit 2620.00",
         "GBP/USD LONG from 1.2750, SL 1.2700, TP1 1.2850, TP2 1.2950",
-        "Bitcoin BTCUSD short entry 45000, stop 46000, target 42000"
+        "Bitcoin BTCUSD short entry 45000, stop 46000, target 42000",
+        "XAUUSD BUY 3,361.06 SL 3,355.62 TP 3,381.01 R:R 1:3.6 15m"
     ]
     
     parser = TradingSignalParser()
@@ -378,4 +533,4 @@ if __name__ == "__main__":
         
         summary = parser.format_signal_summary(signal)
         print(f"Summary:\n{summary}")
-        print("-" * 50)
\ No newline at end of file
+        print("-" * 50)